@@ -0,0 +1,294 @@
+import os
+import time
+import threading
+import itertools
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from rateLimiter import QuotaLimiter, AdaptiveBackoff
+from responseCache import ResponseCache, CacheMiss, is_cacheable
+import metrics
+
+# Connection pool and timeout defaults shared by every Alpha Vantage fetcher.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+# Free-tier Alpha Vantage quotas; override with AV_REQUESTS_PER_MINUTE / AV_REQUESTS_PER_DAY (0 disables).
+DEFAULT_REQUESTS_PER_MINUTE = 5
+DEFAULT_REQUESTS_PER_DAY = 25
+
+# On-disk response cache; set AV_CACHE_DIR to an empty string to disable it.
+DEFAULT_CACHE_DIR = ".av_cache"
+DEFAULT_CACHE_MAX_MB = 512
+
+# Retries for throttled and transient responses before giving up on a request.
+DEFAULT_MAX_RETRIES = 5
+
+# Response classes returned by classify_response.
+OK = "ok"
+THROTTLED = "throttled"
+DAILY_QUOTA = "daily_quota"
+INVALID_SYMBOL = "invalid_symbol"
+PREMIUM_ONLY = "premium_only"
+TRANSIENT = "transient"
+
+# Wording Alpha Vantage uses when it is only asking us to slow down.
+THROTTLE_MARKERS = ("per minute", "per second", "burst", "spreading out", "call frequency")
+# Wording of the notice for a request only premium keys may make (e.g. outputsize=full).
+# The daily-limit notice mentions "premium plans" too, so these must be more specific.
+PREMIUM_MARKERS = ("premium feature", "premium endpoint")
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = None
+_response_cache = None
+_backoff = AdaptiveBackoff()
+_max_retries = DEFAULT_MAX_RETRIES
+_sleep = time.sleep
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    """
+    Build a requests.Session with keep-alive connection pooling for HTTP and HTTPS.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+def close_session():
+    """Close the shared session and release its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def set_rate_limiter(limiter):
+    """Install (or clear, with None) the limiter consulted before every API request."""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+def has_daily_quota():
+    """Whether the installed rate limiter enforces a per-day quota."""
+    return _rate_limiter is not None and _rate_limiter.day_bucket is not None
+
+def set_backoff(backoff):
+    """Replace the shared retry backoff (e.g. with shorter delays for benchmarks)."""
+    global _backoff
+    _backoff = backoff
+
+def set_response_cache(cache):
+    """Install (or clear, with None) the on-disk response cache used by fetch_json."""
+    global _response_cache
+    _response_cache = cache
+
+def configure_from_env():
+    """Configure the shared client from environment variables (call after load_dotenv)."""
+    per_minute = int(os.getenv("AV_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE))
+    per_day = int(os.getenv("AV_REQUESTS_PER_DAY", DEFAULT_REQUESTS_PER_DAY))
+    if per_minute or per_day:
+        set_rate_limiter(QuotaLimiter(per_minute=per_minute, per_day=per_day))
+    else:
+        set_rate_limiter(None)
+
+    global _max_retries
+    _max_retries = int(os.getenv("AV_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+
+    cache_dir = os.getenv("AV_CACHE_DIR", DEFAULT_CACHE_DIR)
+    if cache_dir:
+        max_mb = float(os.getenv("AV_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+        cache_only = os.getenv("AV_CACHE_ONLY", "").lower() in ("1", "true", "yes")
+        set_response_cache(ResponseCache(cache_dir, max_bytes=int(max_mb * 1024 * 1024), cache_only=cache_only))
+    else:
+        set_response_cache(None)
+
+def classify_response(data):
+    """
+    Classify a decoded Alpha Vantage response as OK, THROTTLED (per-minute / burst limit),
+    PREMIUM_ONLY (the request needs a premium key), DAILY_QUOTA (daily limit or any other
+    notice we cannot wait out) or INVALID_SYMBOL.
+    """
+    if not isinstance(data, dict):
+        return OK
+    if "Error Message" in data:
+        return INVALID_SYMBOL
+    message = data.get("Note") or data.get("Information")
+    if message is None:
+        return OK
+    text = str(message).lower()
+    if any(marker in text for marker in THROTTLE_MARKERS):
+        return THROTTLED
+    if any(marker in text for marker in PREMIUM_MARKERS):
+        return PREMIUM_ONLY
+    return DAILY_QUOTA
+
+def check_api_limit(data, symbol, endpoint):
+    """
+    Check if the API response means processing has to stop: the daily limit is reached,
+    or the per-minute throttle outlasted every retry. Invalid symbols and premium-only
+    requests are logged but do not stop the run.
+    """
+    kind = classify_response(data)
+    if kind == INVALID_SYMBOL:
+        logging.error("Invalid request on %s for %s: %s", endpoint, symbol, data.get('Error Message'))
+    elif kind == PREMIUM_ONLY:
+        logging.warning("Premium-only request on %s for %s: %s", endpoint, symbol, data.get('Information') or data.get('Note'))
+    elif kind == THROTTLED:
+        logging.error("Still throttled on %s for %s after %s retries: %s", endpoint, symbol, _max_retries, data.get('Note') or data.get('Information'))
+        return True
+    elif kind == DAILY_QUOTA:
+        logging.error("Daily API limit reached on %s for %s: %s", endpoint, symbol, data.get('Note') or data.get('Information'))
+        return True
+    return False
+
+# Per-thread tallies of network round trips and cache hits; see thread_request_counts().
+_thread_counts = threading.local()
+
+def thread_request_counts():
+    """(network round trips, response-cache hits) fetch_json has made on this thread so far."""
+    return getattr(_thread_counts, "network", 0), getattr(_thread_counts, "cache_hits", 0)
+
+def _request(base_url, params, timeout):
+    """
+    One HTTP round trip. Returns (kind, data); kind is TRANSIENT for retryable failures.
+    Records the call, its latency and the bytes downloaded per endpoint.
+    """
+    endpoint = params.get("function")
+    _thread_counts.network = getattr(_thread_counts, "network", 0) + 1
+    start = time.perf_counter()
+    try:
+        response = get_session().get(base_url, params=params, timeout=timeout)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        metrics.inc("av_api_calls_total", endpoint=endpoint, kind=TRANSIENT)
+        return TRANSIENT, e
+    finally:
+        metrics.observe("av_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+    metrics.inc("av_bytes_downloaded_total", len(response.content), endpoint=endpoint)
+    try:
+        kind, data = _decode(response)
+    except requests.HTTPError:
+        metrics.inc("av_api_calls_total", endpoint=endpoint, kind="error")
+        raise
+    metrics.inc("av_api_calls_total", endpoint=endpoint, kind=kind)
+    return kind, data
+
+def _decode(response):
+    """Map an HTTP response to (kind, data), raising for non-retryable HTTP errors."""
+    if response.status_code == 429:
+        return THROTTLED, None
+    if response.status_code >= 500:
+        return TRANSIENT, requests.HTTPError(f"{response.status_code} Server Error", response=response)
+    response.raise_for_status()
+    try:
+        data = response.json()
+    except ValueError as e:
+        return TRANSIENT, e
+    return classify_response(data), data
+
+def fetch_json(base_url, params, timeout=DEFAULT_TIMEOUT):
+    """
+    Issue a GET request through the shared session and return the decoded JSON body.
+    Fresh responses in the installed cache are returned without touching the network
+    (or the rate limiter); in cache-only mode a miss raises CacheMiss. Otherwise waits
+    on the rate limiter, raising QuotaExhausted when the daily quota is spent.
+    Per-minute throttling and transient failures (connection errors, timeouts, 5xx,
+    undecodable bodies) are retried with adaptive backoff, and throttling also slows
+    the limiter down. When retries run out, the last throttle message is returned
+    (check_api_limit then stops the run) or the last transient error is raised.
+    """
+    cache = _response_cache
+    if cache is not None:
+        data = cache.get(params)
+        if data is not None:
+            metrics.inc("av_cache_hits_total", endpoint=params.get("function"))
+            _thread_counts.cache_hits = getattr(_thread_counts, "cache_hits", 0) + 1
+            return data
+        if cache.cache_only:
+            raise CacheMiss(f"{params.get('function')} for {params.get('symbol')} is not cached.")
+    for attempt in range(_max_retries + 1):
+        if _rate_limiter is not None:
+            _rate_limiter.acquire()
+        kind, data = _request(base_url, params, timeout)
+        if kind not in (THROTTLED, TRANSIENT):
+            break
+        if kind == THROTTLED and _rate_limiter is not None:
+            _rate_limiter.throttled()
+        if attempt == _max_retries:
+            break
+        delay = _backoff.next_delay()
+        logging.warning("%s response for %s %s; retrying in %.1fs.", kind, params.get('function'), params.get('symbol'), delay)
+        _sleep(delay)
+    if kind == TRANSIENT:
+        raise data
+    if kind == THROTTLED and data is None:
+        data = {"Note": "HTTP 429: per minute request limit exceeded."}
+    if kind == OK:
+        _backoff.succeeded()
+        if _rate_limiter is not None:
+            _rate_limiter.succeeded()
+        if cache is not None and is_cacheable(data):
+            cache.put(params, data)
+    return data
+
+def fetch_many(symbols, fetch_fn, max_workers=1):
+    """
+    Run fetch_fn(symbol) for every symbol and yield (symbol, result) in symbol order.
+    fetch_fn returns None when the API limit is reached; that result is yielded and
+    iteration stops, so callers keep the serial stop-on-limit semantics. With
+    max_workers > 1 the calls run on a thread pool and pending symbols are skipped
+    once any call hits the limit. At most 2 * max_workers calls are submitted ahead of
+    the consumer, and each result is released once yielded, so memory stays bounded
+    however many symbols there are.
+    """
+    if max_workers <= 1:
+        for symbol in symbols:
+            result = fetch_fn(symbol)
+            yield symbol, result
+            if result is None:
+                return
+        return
+
+    stop = threading.Event()
+
+    def run(symbol):
+        if stop.is_set():
+            return None
+        result = fetch_fn(symbol)
+        if result is None:
+            stop.set()
+        return result
+
+    pending = iter(symbols)
+    window = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            for symbol in itertools.islice(pending, 2 * max_workers):
+                window.append((symbol, pool.submit(run, symbol)))
+            while window:
+                symbol, future = window.popleft()
+                result = future.result()
+                del future
+                for next_symbol in itertools.islice(pending, 1):
+                    window.append((next_symbol, pool.submit(run, next_symbol)))
+                yield symbol, result
+                if result is None:
+                    return
+                del result
+        finally:
+            stop.set()
+            for _, future in window:
+                future.cancel()
@@ -0,0 +1,70 @@
+"""
+Compare per-ticker peak extraction (filter the frame, then find_peaks per series)
+with the batch engine in pricePeaks.extract_peaks_batch.
+
+Run from the repository root:
+    python -m benchmarks.benchBatchPeaks --tickers 100,1000,3000 --days 250
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+from pricePeaks import extract_peaks_from_series, extract_peaks_batch, find_local_maxima_2d
+
+def make_universe(n_tickers, n_days, seed=0):
+    """Long-format frame of random walks of varying length, rounded so flat peaks occur."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_tickers):
+        length = int(rng.integers(n_days // 2, n_days + 1))
+        prices = np.round(50 + np.cumsum(rng.normal(0, 1, length)), 0)
+        frames.append(pd.DataFrame({
+            "date": pd.bdate_range("2020-01-01", periods=length),
+            "stock_price": prices,
+            "ticker": f"T{i:05d}",
+        }))
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed)
+
+def per_ticker(df, tickers, num_peaks):
+    results = {}
+    for ticker in tickers:
+        ticker_df = df[df['ticker'] == ticker].sort_values(by='date')
+        results[ticker] = extract_peaks_from_series(ticker_df['date'].values, ticker_df['stock_price'].values, num_peaks)
+    return results
+
+def check_local_maxima(df):
+    """Every peak index from the 2-D pass must equal scipy's for that row."""
+    groups = [g.sort_values('date')['stock_price'].to_numpy() for _, g in df.groupby('ticker')]
+    matrix = np.full((len(groups), max(map(len, groups))), np.nan)
+    for i, g in enumerate(groups):
+        matrix[i, :len(g)] = g
+    rows, cols = find_local_maxima_2d(matrix)
+    for i, g in enumerate(groups):
+        expected, _ = find_peaks(g)
+        np.testing.assert_array_equal(cols[rows == i], expected)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", default="100,1000,3000")
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--num-peaks", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tickers':>8} {'per-ticker (s)':>15} {'batch (s)':>10} {'speedup':>8}")
+    for n in (int(x) for x in args.tickers.split(",")):
+        df = make_universe(n, args.days)
+        tickers = sorted(df['ticker'].unique())
+        check_local_maxima(df)
+        start = time.perf_counter()
+        slow = per_ticker(df, tickers, args.num_peaks)
+        slow_time = time.perf_counter() - start
+        start = time.perf_counter()
+        fast = extract_peaks_batch(df, tickers, args.num_peaks)
+        fast_time = time.perf_counter() - start
+        for ticker in tickers:
+            assert slow[ticker] == fast[ticker], ticker
+        print(f"{n:>8} {slow_time:>15.3f} {fast_time:>10.3f} {slow_time / fast_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Offline fetch benchmarks against the local stub server: serial vs concurrent
+fetching, cold vs warm response cache, and throughput under injected throttling.
+
+Run from the repository root:
+    python -m benchmarks.benchFetch --symbols 200 --latency 0.05
+"""
+import argparse
+import logging
+import tempfile
+import time
+import alphaVantageClient as client
+from insiderTransactions import fetch_insider_transactions
+from rateLimiter import AdaptiveBackoff
+from responseCache import ResponseCache
+from benchmarks.stubServer import start_stub_server
+
+def run(symbols, base_url, workers):
+    """Fetch every symbol; returns (seconds, symbols fetched before any limit stop)."""
+    start = time.perf_counter()
+    fetched = 0
+    for _, result in client.fetch_many(symbols, lambda s: fetch_insider_transactions(s, "bench", base_url), workers):
+        if result is None:
+            break
+        fetched += 1
+    return time.perf_counter() - start, fetched
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", default="1,4,16")
+    parser.add_argument("--throttle-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    symbols = [f"S{i:05d}" for i in range(args.symbols)]
+    client.set_rate_limiter(None)
+    client.set_backoff(AdaptiveBackoff(base_delay=0.01, max_delay=0.2))
+
+    print(f"{'scenario':<34} {'seconds':>8} {'symbols/s':>10} {'requests':>9}")
+
+    def report(label, server, seconds, fetched):
+        print(f"{label:<34} {seconds:>8.3f} {fetched / seconds:>10.1f} {server.request_count:>9}")
+        server.request_count = 0
+
+    server, base_url = start_stub_server(latency=args.latency)
+    try:
+        client.set_response_cache(None)
+        for workers in (int(w) for w in args.workers.split(",")):
+            report(f"no cache, {workers} workers", server, *run(symbols, base_url, workers))
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client.set_response_cache(ResponseCache(cache_dir))
+            report("cold cache, 1 worker", server, *run(symbols, base_url, 1))
+            report("warm cache, 1 worker", server, *run(symbols, base_url, 1))
+        client.set_response_cache(None)
+    finally:
+        server.shutdown()
+
+    server, base_url = start_stub_server(latency=args.latency, throttle_rate=args.throttle_rate)
+    try:
+        workers = max(int(w) for w in args.workers.split(","))
+        report(f"{args.throttle_rate:.0%} throttled, {workers} workers", server, *run(symbols, base_url, workers))
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Daily refresh of insider histories: full recomputation versus IncrementalInsiderHistory.
+
+Builds the incremental state for a synthetic universe, then simulates --days daily
+refreshes in which the window rolls forward a day and each symbol gains a few new
+transactions. Times compute_insider_history and update() on every refresh and checks
+that they agree, then that an empty response between two refreshes does not get the
+records applied twice. The incremental state pays off only for long histories: with a
+few hundred transactions per symbol, recomputing is as fast or faster.
+
+Run from the repository root:
+    python -m benchmarks.benchIncrementalHistory --symbols 500 --transactions 2000
+"""
+import time
+import logging
+import argparse
+import datetime
+import tempfile
+import numpy as np
+from insiderTransactions import compute_insider_history, IncrementalInsiderHistory
+from benchmarks.syntheticData import universe_symbols, insider_payload
+
+END_DATE = datetime.date(2025, 1, 31)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--new", type=int, default=3, help="new transactions per symbol per day")
+    parser.add_argument("--days", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    symbols = universe_symbols(args.symbols)
+    first_end = END_DATE - datetime.timedelta(days=args.days)
+    history = {symbol: insider_payload(symbol, args.transactions, end_date=first_end)["data"] for symbol in symbols}
+    incremental = IncrementalInsiderHistory(tempfile.mkdtemp())
+    start = time.perf_counter()
+    for symbol in symbols:
+        incremental.update(symbol, history[symbol], first_end - datetime.timedelta(days=365), first_end)
+    print(f"{args.symbols} symbols x {args.transactions} transactions; initial build {time.perf_counter() - start:.3f}s")
+
+    print(f"{'day':>3} {'full (s)':>10} {'incremental (s)':>16} {'speedup':>8}")
+    for day in range(1, args.days + 1):
+        end_date = first_end + datetime.timedelta(days=day)
+        start_date = end_date - datetime.timedelta(days=365)
+        for symbol in symbols:
+            # The API returns the whole history, newest transactions first.
+            new = insider_payload(symbol, args.new, days=1, end_date=end_date, seed=day)["data"]
+            history[symbol] = new + history[symbol]
+        full = incremental_seconds = 0.0
+        for symbol in symbols:
+            start = time.perf_counter()
+            expected = compute_insider_history(history[symbol], start_date, end_date)
+            full += time.perf_counter() - start
+            start = time.perf_counter()
+            result = incremental.update(symbol, history[symbol], start_date, end_date)
+            incremental_seconds += time.perf_counter() - start
+            np.testing.assert_allclose(result["net_insider"].to_numpy(), expected["net_insider"].to_numpy(),
+                                       rtol=1e-9, atol=1e-6, err_msg=symbol)
+        print(f"{day:>3} {full:>10.3f} {incremental_seconds:>16.3f} {full / incremental_seconds:>7.2f}x")
+
+    # An empty response (outage, throttling) must not make the next refresh re-apply everything.
+    symbol = symbols[0]
+    expected = compute_insider_history(history[symbol], start_date, end_date)
+    incremental.update(symbol, [], start_date, end_date)
+    result = incremental.update(symbol, history[symbol], start_date, end_date)
+    np.testing.assert_allclose(result["net_insider"].to_numpy(), expected["net_insider"].to_numpy(),
+                               rtol=1e-9, atol=1e-6, err_msg=f"{symbol} after an empty response")
+    np.testing.assert_allclose(incremental.net_insider(symbol), expected["net_insider"].iloc[-1], rtol=1e-9, atol=1e-6)
+    print("empty response between refreshes: ok")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Check the vectorized compute_insider_history against the original per-transaction
+loop on a golden set of edge cases, then time both on synthetic transaction lists.
+
+Run from the repository root:
+    python -m benchmarks.benchInsiderHistory --transactions 100,1000,10000,100000
+"""
+import argparse
+import datetime
+import logging
+import time
+import numpy as np
+import pandas as pd
+from insiderTransactions import compute_insider_history
+
+def legacy_compute_insider_history(transactions, start_date, end_date):
+    """The original per-transaction implementation, kept as the reference."""
+    records = []
+    for txn in transactions:
+        txn_date_str = txn.get("transactionDate", "")
+        try:
+            txn_date = datetime.datetime.strptime(txn_date_str, "%Y-%m-%d").date()
+        except Exception:
+            logging.warning(f"Skipping transaction with invalid date: {txn_date_str}")
+            continue
+        if txn_date < start_date or txn_date > end_date:
+            continue
+        try:
+            value = float(txn.get("transactionValue", 0))
+        except Exception:
+            value = 0.0
+        txn_type = txn.get("transactionType", "").lower()
+        if "buy" in txn_type:
+            net_value = value
+        elif "sell" in txn_type:
+            net_value = -value
+        else:
+            net_value = 0.0
+        records.append({"date": txn_date, "net_value": net_value})
+
+    if not records:
+        return pd.DataFrame(columns=['date', 'net_insider'])
+
+    df = pd.DataFrame(records)
+    daily = df.groupby('date')['net_value'].sum().reset_index()
+    daily = daily.sort_values('date')
+    all_dates = pd.date_range(start=start_date, end=end_date)
+    daily = daily.set_index('date').reindex(all_dates, fill_value=0).rename_axis('date').reset_index()
+    daily['net_insider'] = daily['net_value'].cumsum()
+    return daily[['date', 'net_insider']]
+
+START = datetime.date(2024, 1, 1)
+END = datetime.date(2024, 12, 31)
+
+GOLDEN_CASES = {
+    "empty": [],
+    "single buy": [{"transactionDate": "2024-03-01", "transactionType": "Buy", "transactionValue": "1000"}],
+    "buy and sell same day": [
+        {"transactionDate": "2024-03-01", "transactionType": "Buy", "transactionValue": "1000"},
+        {"transactionDate": "2024-03-01", "transactionType": "Sell", "transactionValue": "400.5"},
+    ],
+    "mixed case and other types": [
+        {"transactionDate": "2024-02-01", "transactionType": "OPEN MARKET BUY", "transactionValue": "10"},
+        {"transactionDate": "2024-02-02", "transactionType": "sell-to-cover", "transactionValue": "3"},
+        {"transactionDate": "2024-02-03", "transactionType": "Sale", "transactionValue": "99"},
+        {"transactionDate": "2024-02-04", "transactionType": "Gift", "transactionValue": "5"},
+    ],
+    "invalid dates": [
+        {"transactionDate": "2024-13-01", "transactionType": "Buy", "transactionValue": "1"},
+        {"transactionDate": "not a date", "transactionType": "Buy", "transactionValue": "1"},
+        {"transactionDate": "", "transactionType": "Buy", "transactionValue": "1"},
+        {"transactionType": "Buy", "transactionValue": "1"},
+        {"transactionDate": "2024-05-05", "transactionType": "Buy", "transactionValue": "7"},
+    ],
+    "unpadded date": [{"transactionDate": "2024-6-7", "transactionType": "Buy", "transactionValue": "2"}],
+    "bad values": [
+        {"transactionDate": "2024-04-01", "transactionType": "Buy", "transactionValue": "n/a"},
+        {"transactionDate": "2024-04-02", "transactionType": "Buy", "transactionValue": None},
+        {"transactionDate": "2024-04-03", "transactionType": "Buy"},
+        {"transactionDate": "2024-04-04", "transactionType": "Sell", "transactionValue": "1e3"},
+        {"transactionDate": "2024-04-05", "transactionType": "Buy", "transactionValue": 12.5},
+    ],
+    "nan value": [
+        {"transactionDate": "2024-04-01", "transactionType": "Buy", "transactionValue": "5"},
+        {"transactionDate": "2024-04-10", "transactionType": "Buy", "transactionValue": "NaN"},
+    ],
+    "outside window": [
+        {"transactionDate": "2023-12-31", "transactionType": "Buy", "transactionValue": "1"},
+        {"transactionDate": "2025-01-01", "transactionType": "Buy", "transactionValue": "1"},
+    ],
+    "window edges": [
+        {"transactionDate": "2024-01-01", "transactionType": "Buy", "transactionValue": "1"},
+        {"transactionDate": "2024-12-31", "transactionType": "Sell", "transactionValue": "2"},
+    ],
+    "no type": [{"transactionDate": "2024-08-01", "transactionValue": "3"}],
+}
+
+def make_transactions(n, seed=0):
+    """Synthetic transaction list spread over two years, with a few malformed dates."""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 730, n)
+    dates = (pd.Timestamp("2023-06-01") + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d").tolist()
+    for i in rng.choice(n, size=max(1, n // 200), replace=False):
+        dates[i] = "bad-date"
+    types = rng.choice(["Buy", "Sell", "Option Exercise"], n, p=[0.3, 0.6, 0.1])
+    values = rng.lognormal(10, 2, n)
+    return [
+        {"transactionDate": d, "transactionType": t, "transactionValue": f"{v:.2f}"}
+        for d, t, v in zip(dates, types, values)
+    ]
+
+def assert_same(expected, actual, label):
+    assert list(expected.columns) == list(actual.columns), label
+    assert len(expected) == len(actual), label
+    if len(expected):
+        assert (expected["date"].to_numpy() == actual["date"].to_numpy()).all(), label
+        np.testing.assert_array_equal(expected["net_insider"].to_numpy(), actual["net_insider"].to_numpy(), err_msg=label)
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", default="100,1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    for label, transactions in GOLDEN_CASES.items():
+        assert_same(legacy_compute_insider_history(transactions, START, END),
+                    compute_insider_history(transactions, START, END), label)
+    print(f"golden set: {len(GOLDEN_CASES)} cases identical")
+
+    print(f"{'transactions':>12} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for n in (int(x) for x in args.transactions.split(",")):
+        transactions = make_transactions(n)
+        assert_same(legacy_compute_insider_history(transactions, START, END),
+                    compute_insider_history(transactions, START, END), f"synthetic {n}")
+        slow = best_of(lambda: legacy_compute_insider_history(transactions, START, END), args.repeat)
+        fast = best_of(lambda: compute_insider_history(transactions, START, END), args.repeat)
+        print(f"{n:>12} {slow:>12.4f} {fast:>15.4f} {slow / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
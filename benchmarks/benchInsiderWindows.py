@@ -0,0 +1,50 @@
+"""
+Net insider flow over several trailing windows for a whole universe: one
+compute_insider_history call per symbol and window versus a single insider_flow_matrix.
+
+Checks that both agree on every symbol and window, then prints the timings.
+
+Run from the repository root:
+    python -m benchmarks.benchInsiderWindows --symbols 1000 --windows 30,90,180,365
+"""
+import time
+import logging
+import argparse
+import datetime
+import numpy as np
+from insiderTransactions import compute_insider_history, insider_flow_matrix
+from benchmarks.syntheticData import universe_symbols, insider_payload
+
+END_DATE = datetime.date(2025, 1, 31)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--transactions", type=int, default=200)
+    parser.add_argument("--windows", default="30,90,180,365")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    windows = [int(w) for w in args.windows.split(",")]
+    transactions = {symbol: insider_payload(symbol, args.transactions, end_date=END_DATE)["data"]
+                    for symbol in universe_symbols(args.symbols)}
+
+    start = time.perf_counter()
+    expected = np.zeros((args.symbols, len(windows)))
+    for row, symbol_transactions in enumerate(transactions.values()):
+        for column, window in enumerate(windows):
+            history = compute_insider_history(symbol_transactions, END_DATE - datetime.timedelta(days=window), END_DATE)
+            expected[row, column] = 0.0 if history.empty else history["net_insider"].iloc[-1]
+    per_window = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = insider_flow_matrix(transactions, windows, as_of=END_DATE)
+    single_pass = time.perf_counter() - start
+
+    np.testing.assert_allclose(matrix.to_numpy(), expected, rtol=1e-9, atol=1e-6)
+    print(f"{args.symbols} symbols x {len(windows)} windows, {args.transactions} transactions each")
+    print(f"compute_insider_history per window: {per_window:.3f}s")
+    print(f"insider_flow_matrix:                {single_pass:.3f}s ({per_window / single_pass:.1f}x)")
+
+if __name__ == "__main__":
+    main()
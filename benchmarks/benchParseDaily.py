@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: per-row TIME_SERIES_DAILY parsing (the original implementation)
+against the vectorized pricePeaks.parse_daily_series.
+
+Run from the repository root:
+    python -m benchmarks.benchParseDaily --rows 100,6000,1000000
+
+The per-row path needs several minutes at 1M rows; cap it with --legacy-max-rows.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from pricePeaks import parse_daily_series
+
+def make_time_series(n, seed=0):
+    """Synthetic "Time Series (Daily)" mapping with n rows, newest first like the API."""
+    rng = np.random.default_rng(seed)
+    # Daily keys overflow pandas' Timestamp range for very long series; use minute stamps there.
+    freq = "D" if n <= 50_000 else "min"
+    dates = pd.date_range("1990-01-01", periods=n, freq=freq)
+    fmt = "%Y-%m-%d" if freq == "D" else "%Y-%m-%d %H:%M:%S"
+    keys = dates.strftime(fmt)[::-1]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return {
+        key: {
+            "1. open": f"{c * 0.99:.4f}",
+            "2. high": f"{c * 1.01:.4f}",
+            "3. low": f"{c * 0.98:.4f}",
+            "4. close": f"{c:.4f}",
+            "5. volume": str(int(v)),
+        }
+        for key, c, v in zip(keys, close, rng.integers(1_000, 1_000_000, n))
+    }
+
+def legacy_parse(time_series, symbol):
+    """The per-row conversion fetch_data_for_symbol used before parse_daily_series."""
+    df = pd.DataFrame([
+        {"date": pd.to_datetime(date), "stock_price": float(values["4. close"]), "ticker": symbol}
+        for date, values in time_series.items()
+    ])
+    return df.sort_values(by="date")
+
+def best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="100,6000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy-max-rows", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for n in (int(r) for r in args.rows.split(",")):
+        time_series = make_time_series(n)
+        repeat = args.repeat if n <= 10_000 else 1
+        fast, fast_df = best_of(lambda: parse_daily_series(time_series, "BENCH"), repeat)
+        if args.legacy_max_rows is not None and n > args.legacy_max_rows:
+            print(f"{n:>10} {'skipped':>12} {fast:>15.4f} {'-':>8}")
+            continue
+        slow, slow_df = best_of(lambda: legacy_parse(time_series, "BENCH"), repeat)
+        assert np.array_equal(slow_df["stock_price"].to_numpy(), fast_df["stock_price"].to_numpy())
+        print(f"{n:>10} {slow:>12.4f} {fast:>15.4f} {slow / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compare bare requests.get against the pooled shared session on a local stub server.
+
+Run from the repository root:
+    python -m benchmarks.benchSession --requests 500
+"""
+import argparse
+import time
+import requests
+from alphaVantageClient import create_session, DEFAULT_TIMEOUT
+from benchmarks.stubServer import start_stub_server
+
+def time_requests(get, base_url, n):
+    params = {"function": "OVERVIEW", "symbol": "IBM", "apikey": "bench"}
+    start = time.perf_counter()
+    for _ in range(n):
+        response = get(base_url, params=params, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        response.json()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    try:
+        bare = time_requests(requests.get, base_url, args.requests)
+        session = create_session()
+        pooled = time_requests(session.get, base_url, args.requests)
+        session.close()
+    finally:
+        server.shutdown()
+
+    n = args.requests
+    print(f"bare requests.get : {bare:.3f}s total, {bare / n * 1000:.3f} ms/request")
+    print(f"pooled session    : {pooled:.3f}s total, {pooled / n * 1000:.3f} ms/request")
+    print(f"speedup           : {bare / pooled:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Scaling of the per-symbol CPU stages on a SharedMemoryPool versus one process.
+
+Times compute_insider_histories and extract_peaks_many over a synthetic universe,
+serially and with each worker count, and checks that every pooled result equals
+the serial one.
+
+Run from the repository root:
+    python -m benchmarks.benchSharedPool --symbols 5000 --workers 2,4,8,16,32
+"""
+import os
+import time
+import logging
+import argparse
+import datetime
+from insiderTransactions import compute_insider_histories
+from pricePeaks import parse_daily_series, extract_peaks_many
+from sharedPool import SharedMemoryPool
+from benchmarks.syntheticData import universe_symbols, insider_payload, daily_payload
+
+END_DATE = datetime.date(2025, 1, 31)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--workers", default=f"2,{os.cpu_count() or 1}")
+    parser.add_argument("--transactions", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=1000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    start_date = END_DATE - datetime.timedelta(days=365)
+    symbols = universe_symbols(args.symbols)
+    transactions = {symbol: insider_payload(symbol, args.transactions, end_date=END_DATE)["data"] for symbol in symbols}
+    series = {}
+    for symbol in symbols:
+        df = parse_daily_series(daily_payload(symbol, args.bars, end_date=END_DATE)["Time Series (Daily)"], symbol)
+        series[symbol] = (df["date"].to_numpy(), df["stock_price"].to_numpy())
+
+    print(f"{args.symbols} symbols, {os.cpu_count()} CPUs")
+    print(f"{'stage':<28} {'workers':>7} {'seconds':>9} {'speedup':>8}")
+    stages = {
+        "compute_insider_histories": lambda pool: compute_insider_histories(transactions, start_date, END_DATE, pool),
+        "extract_peaks_many": lambda pool: extract_peaks_many(series, num_peaks=3, pool=pool),
+    }
+    for stage, run in stages.items():
+        start = time.perf_counter()
+        expected = run(None)
+        serial = time.perf_counter() - start
+        print(f"{stage:<28} {1:>7} {serial:>9.3f} {1.0:>7.2f}x")
+        for workers in (int(w) for w in args.workers.split(",")):
+            with SharedMemoryPool(workers) as pool:
+                run(pool)  # Warm up the worker processes.
+                start = time.perf_counter()
+                result = run(pool)
+                seconds = time.perf_counter() - start
+            if stage == "compute_insider_histories":
+                assert all(result[s].equals(expected[s]) for s in symbols), stage
+            else:
+                assert result == expected, stage
+            print(f"{stage:<28} {workers:>7} {seconds:>9.3f} {serial / seconds:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
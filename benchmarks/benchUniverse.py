@@ -0,0 +1,134 @@
+"""
+Universe-scale benchmark suite on deterministic synthetic payloads.
+
+For each universe size it times the JSON-to-DataFrame step (parse_daily_series),
+compute_insider_history, extract_peaks_from_series, extract_peaks_batch and
+get_top_companies, plus the memory-mapped PriceMatrix path (filling it,
+get_top_companies_matrix and extract_peaks_matrix), and writes a machine-readable JSON report for tracking
+regressions between commits.
+
+Run from the repository root:
+    python -m benchmarks.benchUniverse --scales 10,100,1000 --output benchmark_report.json
+
+Scales up to 100000 symbols work but take a while and several GB of memory.
+"""
+import sys
+import json
+import tempfile
+import time
+import logging
+import argparse
+import datetime
+import platform
+import subprocess
+import numpy as np
+import pandas as pd
+import scipy
+from insiderTransactions import compute_insider_history
+from pricePeaks import (parse_daily_series, extract_peaks_from_series, extract_peaks_batch, get_top_companies,
+                        get_top_companies_matrix, extract_peaks_matrix)
+from priceMatrix import PriceMatrix
+from benchmarks.syntheticData import universe_symbols, insider_payload, daily_payload
+
+END_DATE = datetime.date(2025, 1, 31)
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_scale(n_symbols, args):
+    """Time every stage over a universe of n_symbols; returns {stage: seconds}."""
+    timings = dict.fromkeys(["parse_daily_series", "compute_insider_history", "extract_peaks_from_series",
+                             "extract_peaks_batch", "get_top_companies", "price_matrix_update",
+                             "get_top_companies_matrix", "extract_peaks_matrix"], 0.0)
+    start_date = END_DATE - datetime.timedelta(days=365)
+    frames = []
+    for symbol in universe_symbols(n_symbols):
+        # Payload generation is not timed.
+        daily = daily_payload(symbol, n_bars=args.bars, volatility=args.volatility,
+                              plateau_fraction=args.plateau_fraction, end_date=END_DATE, seed=args.seed)
+        insider = insider_payload(symbol, n_transactions=args.transactions, buy_fraction=args.buy_fraction,
+                                  malformed_fraction=args.malformed_fraction, end_date=END_DATE, seed=args.seed)
+
+        start = time.perf_counter()
+        df = parse_daily_series(daily["Time Series (Daily)"], symbol)
+        timings["parse_daily_series"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        compute_insider_history(insider["data"], start_date, END_DATE)
+        timings["compute_insider_history"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        extract_peaks_from_series(df['date'].values, df['stock_price'].values, num_peaks=3)
+        timings["extract_peaks_from_series"] += time.perf_counter() - start
+        frames.append(df[['date', 'stock_price', 'ticker']])
+
+    data_df = pd.concat(frames, ignore_index=True)
+    del frames
+    start = time.perf_counter()
+    top = get_top_companies(data_df, top_n=5)
+    timings["get_top_companies"] = time.perf_counter() - start
+
+    tickers = data_df['ticker'].unique().tolist()
+    start = time.perf_counter()
+    extract_peaks_batch(data_df, tickers, num_peaks=3)
+    timings["extract_peaks_batch"] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        matrix = PriceMatrix(directory)
+        start = time.perf_counter()
+        for ticker, group in data_df.groupby('ticker', sort=False):
+            matrix.update(ticker, group['date'], group['stock_price'])
+        matrix.flush()
+        timings["price_matrix_update"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        get_top_companies_matrix(matrix, top_n=5)
+        timings["get_top_companies_matrix"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        extract_peaks_matrix(matrix, tickers, num_peaks=3)
+        timings["extract_peaks_matrix"] = time.perf_counter() - start
+        del matrix
+    return timings, top
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10,100,1000,10000")
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--volatility", type=float, default=0.02)
+    parser.add_argument("--plateau-fraction", type=float, default=0.05)
+    parser.add_argument("--transactions", type=int, default=50)
+    parser.add_argument("--buy-fraction", type=float, default=0.3)
+    parser.add_argument("--malformed-fraction", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_report.json")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    report = {
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "scipy": scipy.__version__},
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": [],
+    }
+    print(f"{'symbols':>8} {'stage':<28} {'seconds':>10} {'us/symbol':>11}")
+    for n_symbols in (int(s) for s in args.scales.split(",")):
+        timings, _ = bench_scale(n_symbols, args)
+        for stage, seconds in timings.items():
+            per_symbol = seconds / n_symbols * 1e6
+            report["results"].append({"symbols": n_symbols, "stage": stage, "seconds": seconds,
+                                      "us_per_symbol": per_symbol})
+            print(f"{n_symbols:>8} {stage:<28} {seconds:>10.4f} {per_symbol:>11.1f}")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
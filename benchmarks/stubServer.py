@@ -0,0 +1,195 @@
+"""
+Local stand-in for the Alpha Vantage API, for offline benchmarks and regression runs.
+
+Serves INSIDER_TRANSACTIONS, OVERVIEW and TIME_SERIES_DAILY from recorded fixtures
+(<fixtures>/<FUNCTION>/<SYMBOL>.json) or, when no fixture exists, from small synthetic
+payloads generated deterministically per symbol. It can add latency and inject
+per-minute throttle Notes, daily-quota Information messages, invalid-symbol errors
+and HTTP 500s, and with --free-key refuse outputsize=full as a premium feature. Point either script at it through BASE_URL:
+
+    python -m benchmarks.stubServer --port 8765 --latency 0.05 --throttle-rate 0.1
+    BASE_URL=http://127.0.0.1:8765/query python insiderTransactions.py
+
+With --record-from URL --api-key KEY, fixtures missing locally are fetched from the
+real API once and saved, so later runs replay them.
+"""
+import os
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import requests
+from priceStore import COMPACT_BARS
+from benchmarks.syntheticData import insider_payload, daily_payload, overview_payload
+
+THROTTLE_NOTE = ("Thank you for using Alpha Vantage! Our standard API rate limit is 5 requests per minute. "
+                 "Please consider spreading out your free API requests more sparingly.")
+DAILY_INFORMATION = ("Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day. "
+                     "Please subscribe to any of the premium plans to instantly remove all daily rate limits.")
+PREMIUM_INFORMATION = ("Thank you for using Alpha Vantage! The **outputsize=full** parameter value is a premium "
+                       "feature for the TIME_SERIES_DAILY endpoint. You may subscribe to any of the premium plans at "
+                       "https://www.alphavantage.co/premium/ to instantly unlock all premium features")
+# Bars in a synthetic outputsize=full response.
+FULL_BARS = 1000
+INVALID_MESSAGE = "Invalid API call. Please retry or visit the documentation (https://www.alphavantage.co/documentation/) for {function}."
+
+def synthetic_payload(function, symbol, outputsize="compact"):
+    """Deterministic synthetic payload for `symbol`, with dates ending today so every stage has data."""
+    if function == "INSIDER_TRANSACTIONS":
+        return insider_payload(symbol, n_transactions=30, days=365, malformed_fraction=0.0)
+    if function == "OVERVIEW":
+        return overview_payload(symbol)
+    if function == "TIME_SERIES_DAILY":
+        # Compact is the newest COMPACT_BARS of the full series, as with the real API, so a
+        # full seed and later compact deltas line up.
+        payload = daily_payload(symbol, n_bars=FULL_BARS)
+        if outputsize == "compact":
+            series = payload["Time Series (Daily)"]
+            payload["Time Series (Daily)"] = dict(itertools.islice(series.items(), COMPACT_BARS))
+        return payload
+    return {"Error Message": INVALID_MESSAGE.format(function=function)}
+
+def fixture_path(fixtures_dir, function, symbol):
+    return os.path.join(fixtures_dir, function, f"{symbol}.json")
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve Alpha Vantage-style JSON over keep-alive HTTP/1.1 connections."""
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # keep-alive response stalls on the peer's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        function = query.get("function", "")
+        symbol = query.get("symbol", "")
+        with server.lock:
+            server.request_count += 1
+            roll = server.rng.random()
+            now = time.monotonic()
+            window = server.minute_window
+            while window and now - window[0] > 60:
+                window.popleft()
+            window.append(now)
+            over_minute = server.per_minute is not None and len(window) > server.per_minute
+            over_day = server.per_day is not None and server.request_count > server.per_day
+
+        if server.latency:
+            time.sleep(server.latency * server.rng.uniform(0.5, 1.5))
+
+        if roll < server.error_rate:
+            self._send(500, {"error": "injected server error"}, "error")
+        elif over_day:
+            self._send(200, {"Information": DAILY_INFORMATION}, "daily_quota")
+        elif over_minute or roll < server.error_rate + server.throttle_rate:
+            self._send(200, {"Note": THROTTLE_NOTE}, "throttled")
+        elif server.free_key and query.get("outputsize") == "full":
+            self._send(200, {"Information": PREMIUM_INFORMATION}, "premium_only")
+        elif symbol in server.invalid_symbols:
+            self._send(200, {"Error Message": INVALID_MESSAGE.format(function=function)}, "invalid_symbol")
+        else:
+            self._send(200, self._payload(function, symbol, query), "ok")
+
+    def _payload(self, function, symbol, query):
+        server = self.server
+        if server.fixtures_dir:
+            path = fixture_path(server.fixtures_dir, function, symbol)
+            if os.path.exists(path):
+                with open(path) as f:
+                    return json.load(f)
+            if server.record_from:
+                params = dict(query, apikey=server.api_key)
+                data = requests.get(server.record_from, params=params, timeout=30).json()
+                if not ("Note" in data or "Information" in data or "Error Message" in data):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "w") as f:
+                        json.dump(data, f)
+                return data
+        return synthetic_payload(function, symbol, query.get("outputsize", "compact"))
+
+    def _send(self, status, payload, kind):
+        body = json.dumps(payload).encode()
+        with self.server.lock:
+            self.server.stats[kind] += 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(host="127.0.0.1", port=0, fixtures_dir=None, latency=0.0, throttle_rate=0.0,
+                      error_rate=0.0, per_minute=None, per_day=None, invalid_symbols=(), seed=0,
+                      record_from=None, api_key=None, free_key=False):
+    """
+    Start the stub server on a background thread.
+    Returns (server, base_url); call server.shutdown() when done. server.request_count
+    and server.stats (responses by kind) record what was served.
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.request_count = 0
+    server.stats = Counter()
+    server.lock = threading.Lock()
+    server.rng = random.Random(seed)
+    server.minute_window = deque()
+    server.fixtures_dir = fixtures_dir
+    server.latency = latency
+    server.throttle_rate = throttle_rate
+    server.error_rate = error_rate
+    server.per_minute = per_minute
+    server.per_day = per_day
+    server.invalid_symbols = set(invalid_symbols)
+    server.record_from = record_from
+    server.api_key = api_key
+    server.free_key = free_key
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/query"
+    return server, base_url
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="directory of recorded <FUNCTION>/<SYMBOL>.json fixtures")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean added latency per request, in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with a throttle Note")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--per-minute", type=int, help="throttle beyond this many requests per rolling minute")
+    parser.add_argument("--per-day", type=int, help="answer with the daily-quota message after this many requests")
+    parser.add_argument("--invalid-symbols", default="", help="comma-separated symbols answered with an Error Message")
+    parser.add_argument("--free-key", action="store_true", help="refuse outputsize=full like the API does for free keys")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record-from", help="real API URL to fetch and save missing fixtures from")
+    parser.add_argument("--api-key", help="API key used with --record-from")
+    args = parser.parse_args()
+
+    if args.record_from and not args.fixtures:
+        parser.error("--record-from needs --fixtures")
+    server, base_url = start_stub_server(
+        args.host, args.port, fixtures_dir=args.fixtures, latency=args.latency,
+        throttle_rate=args.throttle_rate, error_rate=args.error_rate, per_minute=args.per_minute,
+        per_day=args.per_day, invalid_symbols=[s for s in args.invalid_symbols.split(",") if s],
+        seed=args.seed, record_from=args.record_from, api_key=args.api_key, free_key=args.free_key,
+    )
+    print(f"Serving stub Alpha Vantage API at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"Served {server.request_count} requests: {dict(server.stats)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Deterministic synthetic Alpha Vantage payloads for universe-scale benchmarks.
+
+Every payload is a pure function of (symbol, seed, parameters), so runs at any
+scale are reproducible without storing fixtures.
+"""
+import zlib
+import datetime
+import numpy as np
+import pandas as pd
+
+def symbol_rng(symbol, seed=0, salt=""):
+    return np.random.default_rng([zlib.crc32(f"{salt}:{symbol}".encode()), seed])
+
+def universe_symbols(n_symbols):
+    """Symbol names S00000, S00001, ... for a universe of n_symbols."""
+    width = max(5, len(str(n_symbols - 1)))
+    return [f"S{i:0{width}d}" for i in range(n_symbols)]
+
+def insider_payload(symbol, n_transactions=50, buy_fraction=0.3, malformed_fraction=0.01,
+                    days=730, end_date=None, seed=0):
+    """
+    INSIDER_TRANSACTIONS payload with n_transactions spread over the `days` before end_date.
+    buy_fraction of them are buys, most of the rest sells with a few other types, and
+    malformed_fraction carry an unparsable transactionDate.
+    """
+    rng = symbol_rng(symbol, seed, "insider")
+    end_date = end_date or datetime.date.today()
+    offsets = rng.integers(0, days, n_transactions)
+    dates = (pd.Timestamp(end_date) - pd.to_timedelta(offsets, unit="D")).strftime("%Y-%m-%d").tolist()
+    for i in np.flatnonzero(rng.random(n_transactions) < malformed_fraction):
+        dates[i] = str(rng.choice(["", "N/A", "2024-13-45", "01/02/2024"]))
+    sell_fraction = (1 - buy_fraction) * 0.9
+    types = rng.choice(["Buy", "Sell", "Option Exercise"], n_transactions,
+                       p=[buy_fraction, sell_fraction, 1 - buy_fraction - sell_fraction]).tolist()
+    values = rng.lognormal(11, 1.5, n_transactions)
+    return {"data": [
+        {"transactionDate": d, "transactionType": t, "transactionValue": f"{v:.2f}"}
+        for d, t, v in zip(dates, types, values)
+    ]}
+
+def daily_payload(symbol, n_bars=100, volatility=0.02, plateau_fraction=0.05, end_date=None, seed=0):
+    """
+    TIME_SERIES_DAILY payload with n_bars business days ending at end_date (newest first,
+    like the API). Closes follow a geometric random walk with the given daily volatility;
+    plateau_fraction of the days repeat the previous close, producing flat peaks.
+    """
+    rng = symbol_rng(symbol, seed, "daily")
+    end_date = end_date or datetime.date.today()
+    returns = rng.normal(0, volatility, n_bars)
+    returns[rng.random(n_bars) < plateau_fraction] = 0.0
+    close = np.round(rng.uniform(5, 500) * np.exp(np.cumsum(returns)), 4)
+    open_ = np.round(close * (1 + rng.normal(0, volatility / 2, n_bars)), 4)
+    high = np.round(np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 2, n_bars))), 4)
+    low = np.round(np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 2, n_bars))), 4)
+    volume = rng.integers(10**4, 10**7, n_bars)
+    dates = pd.bdate_range(end=end_date, periods=n_bars).strftime("%Y-%m-%d")[::-1]
+    close, open_, high, low, volume = (a[::-1] for a in (close, open_, high, low, volume))
+    return {
+        "Meta Data": {"2. Symbol": symbol},
+        "Time Series (Daily)": {
+            d: {"1. open": f"{o:.4f}", "2. high": f"{h:.4f}", "3. low": f"{l:.4f}",
+                "4. close": f"{c:.4f}", "5. volume": str(v)}
+            for d, o, h, l, c, v in zip(dates, open_, high, low, close, volume)
+        },
+    }
+
+def overview_payload(symbol, seed=0):
+    rng = symbol_rng(symbol, seed, "overview")
+    return {"Symbol": symbol, "MarketCapitalization": str(int(rng.integers(10**8, 10**12)))}
@@ -0,0 +1,168 @@
+import os
+import datetime
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; partitions fall back to NumPy .npz files.
+    pa = pq = None
+
+# Datasets kept in the lake, one directory each.
+PRICES = "prices"
+INSIDER_TRANSACTIONS = "insider_transactions"
+OVERVIEWS = "overviews"
+
+# Columns that identify a row within a symbol's partition. None means the whole row,
+# since insider transactions carry no id; identical rows are then told apart by their
+# occurrence, so genuinely repeated records are kept. Later appends win on overlap.
+DEDUPE_KEYS = {
+    PRICES: ["date"],
+    INSIDER_TRANSACTIONS: None,
+    OVERVIEWS: ["date"],
+}
+
+# Sorted by date, small row groups let Parquet skip most of a partition on date filters.
+ROW_GROUP_ROWS = 4096
+
+class DataLake:
+    """
+    Local columnar store of fetched API data, partitioned by dataset and symbol:
+    <root>/<dataset>/symbol=<SYMBOL>/part.parquet (or part.npz without pyarrow).
+
+    Every partition has a datetime64 'date' column and is kept sorted by it, so reads
+    can push a date range down to the file and select only the columns they need.
+    Appends merge into the partition, drop duplicates and rewrite it atomically;
+    replace() swaps in a symbol's full data for endpoints that always return it all.
+    """
+    def __init__(self, root, format=None):
+        self.root = root
+        self.format = format or ("parquet" if pq is not None else "npz")
+        if self.format == "parquet" and pq is None:
+            raise ImportError("The parquet format needs pyarrow; use format='npz' instead.")
+
+    def partition_path(self, dataset, symbol):
+        return os.path.join(self.root, dataset, f"symbol={symbol}", f"part.{self.format}")
+
+    def symbols(self, dataset):
+        """Symbols with a partition in `dataset`, sorted."""
+        directory = os.path.join(self.root, dataset)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(directory)
+                      if name.startswith("symbol=") and os.path.exists(self.partition_path(dataset, name.split("=", 1)[1])))
+
+    def append(self, dataset, symbol, df):
+        """Merge `df` into the symbol's partition. Returns the number of rows added."""
+        if df.empty:
+            return 0
+        existing = self.read(dataset, symbol)
+        new = _normalize(df)
+        keys = DEDUPE_KEYS.get(dataset)
+        if keys is None:
+            # The n-th copy of a record only matches the n-th copy already stored.
+            keys = list(dict.fromkeys([*existing.columns, *new.columns])) + ["_occurrence"]
+            existing = existing.assign(_occurrence=_occurrences(existing))
+            new = new.assign(_occurrence=_occurrences(new))
+        merged = new if existing.empty else pd.concat([existing, new], ignore_index=True)
+        merged = merged.drop_duplicates(subset=keys, keep="last").drop(columns="_occurrence", errors="ignore")
+        self._write(dataset, symbol, merged)
+        return len(merged) - len(existing)
+
+    def replace(self, dataset, symbol, df):
+        """Replace the symbol's partition with `df` (removing it if `df` is empty)."""
+        if df.empty:
+            path = self.partition_path(dataset, symbol)
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        self._write(dataset, symbol, _normalize(df))
+
+    def _write(self, dataset, symbol, df):
+        """Sort `df` by date and write it as the symbol's partition, atomically."""
+        merged = df.sort_values(by="date", kind="stable").reset_index(drop=True)
+        path = self.partition_path(dataset, symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if self.format == "parquet":
+            pq.write_table(pa.Table.from_pandas(merged, preserve_index=False), tmp_path,
+                           row_group_size=ROW_GROUP_ROWS)
+        else:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **{column: _to_array(merged[column]) for column in merged.columns})
+        os.replace(tmp_path, path)
+
+    def read(self, dataset, symbol, columns=None, start=None, end=None):
+        """
+        Read a symbol's partition, optionally only `columns` and rows with
+        start <= date <= end. Returns an empty DataFrame if nothing is stored.
+        """
+        path = self.partition_path(dataset, symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns) if columns else pd.DataFrame()
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        if self.format == "parquet":
+            filters = []
+            if start is not None:
+                filters.append(("date", ">=", start))
+            if end is not None:
+                filters.append(("date", "<=", end))
+            return pq.read_table(path, columns=columns, filters=filters or None).to_pandas()
+        with np.load(path) as data:
+            keep = slice(None)
+            if start is not None or end is not None:
+                dates = data["date"]
+                # Partitions are sorted by date, so the range is a contiguous slice.
+                lo = np.searchsorted(dates, start.to_datetime64(), side="left") if start is not None else 0
+                hi = np.searchsorted(dates, end.to_datetime64(), side="right") if end is not None else len(dates)
+                keep = slice(lo, hi)
+            return pd.DataFrame({column: _from_array(data[column][keep]) for column in (columns or data.files)})
+
+    def read_dataset(self, dataset, symbols=None, columns=None, start=None, end=None):
+        """Read several symbols' partitions into one frame with a 'symbol' column."""
+        frames = []
+        for symbol in symbols if symbols is not None else self.symbols(dataset):
+            df = self.read(dataset, symbol, columns, start, end)
+            if not df.empty:
+                frames.append(df.assign(symbol=symbol))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+def _occurrences(df):
+    """Number each row among the identical rows before it (0 for the first copy)."""
+    if df.empty:
+        return pd.Series(dtype=np.int64)
+    return df.groupby(list(df.columns), dropna=False, sort=False).cumcount()
+
+def _normalize(df):
+    """Coerce text columns to plain strings so both formats store and compare them alike."""
+    df = df.reset_index(drop=True).copy()
+    for column in df.columns:
+        if pd.api.types.is_object_dtype(df[column]) or pd.api.types.is_string_dtype(df[column]):
+            df[column] = df[column].fillna("").astype(str)
+    return df
+
+def _to_array(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype="datetime64[ns]")
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.to_numpy()
+    return series.to_numpy(dtype=str)
+
+def _from_array(array):
+    return array.astype(object) if array.dtype.kind == "U" else array
+
+def insider_frame(transactions):
+    """INSIDER_TRANSACTIONS records as a frame with a parsed 'date' column (NaT if invalid)."""
+    df = pd.DataFrame(transactions)
+    raw_dates = df["transactionDate"] if "transactionDate" in df else pd.Series("", index=df.index)
+    df["date"] = pd.to_datetime(raw_dates, format="%Y-%m-%d", errors="coerce")
+    return df
+
+def overview_frame(overview, as_of=None):
+    """A one-row snapshot of an OVERVIEW response taken on `as_of` (default today)."""
+    as_of = pd.Timestamp(as_of or datetime.date.today())
+    return pd.DataFrame([{**{key: str(value) for key, value in overview.items()}, "date": as_of}])
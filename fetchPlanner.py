@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import threading
+from collections import Counter
+from alphaVantageClient import thread_request_counts
+
+class LimitReached(Exception):
+    """An endpoint node hit the API limit; evaluation of the symbol stops."""
+
+class FetchPlanner:
+    """
+    Per-symbol dependency graph of API endpoints and the stages built on them,
+    evaluated on demand.
+
+    Each node is fn(symbol, need), where need(name) returns the value of another
+    node, evaluating it (once per symbol) the first time it is asked for. A node
+    only pulls the inputs it actually uses, so an endpoint behind a stage that
+    returns early is never requested; need.skip(name, reason) records that a node
+    served an endpoint's data some other way (e.g. from a cache). Endpoint nodes
+    return None when the API limit is reached, which stops the symbol's evaluation.
+
+    `on_endpoint_done(symbol, endpoint, value)`, if set, is called after each endpoint
+    node succeeds; `restore(symbol, endpoint)`, if set, may return an endpoint's value
+    from an earlier run (e.g. a checkpoint), in which case the node is not evaluated.
+
+    The planner counts, per endpoint, the calls made (network round trips, retries
+    included) and the calls saved compared with fetching every endpoint for every
+    symbol (responses served from the response cache count as saved). A symbol cut
+    off by the API limit credits no savings for the endpoints it never reached.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.endpoints = {}
+        self.calls_made = Counter()
+        self.calls_saved = Counter()
+        self.on_endpoint_done = None
+        self.restore = None
+        self._lock = threading.Lock()
+
+    def add(self, name, fn, endpoint=None):
+        self.nodes[name] = fn
+        if endpoint is not None:
+            self.endpoints[name] = endpoint
+
+    def start(self, symbol):
+        """Begin evaluating `symbol`; see PlanSession."""
+        return PlanSession(self, symbol)
+
+    def evaluate(self, symbol, target):
+        """
+        Evaluate `target` for `symbol`, pulling only the nodes it needs.
+        Returns None if an endpoint hit the API limit.
+        """
+        session = self.start(symbol)
+        try:
+            return session(target)
+        except LimitReached:
+            return None
+        finally:
+            session.finish()
+
+    def report(self):
+        """One-line summary of calls made and saved in this run."""
+        made = sum(self.calls_made.values())
+        saved = sum(self.calls_saved.values())
+        details = ", ".join(f"{endpoint} {reason}: {count}" for (endpoint, reason), count in sorted(self.calls_saved.items()))
+        return f"API calls made: {made}, saved: {saved}" + (f" ({details})" if details else "")
+
+class PlanSession:
+    """
+    One symbol's evaluation state, so the nodes it pulls can be spread over several
+    calls (e.g. the stages of a pipeline). The session is the `need` passed to nodes:
+    session(name) returns a node's value, evaluating it once, and raises LimitReached
+    when an endpoint hits the API limit; session.skip(name, reason) records an endpoint
+    served some other way. finish() adds the session's calls to the planner's counts.
+    """
+    def __init__(self, planner, symbol):
+        self.planner = planner
+        self.symbol = symbol
+        self.values = {}
+        self.requested = {}
+        self.skipped = {}
+        self.limited = False
+        self.finished = False
+
+    def __call__(self, name):
+        if name not in self.values:
+            planner = self.planner
+            endpoint = planner.endpoints.get(name)
+            restored = None
+            if endpoint is not None and planner.restore is not None:
+                restored = planner.restore(self.symbol, endpoint)
+            if endpoint is None:
+                value = planner.nodes[name](self.symbol, self)
+            elif restored is not None:
+                value = restored
+                self.skip(name, "checkpoint")
+            else:
+                # Endpoint nodes fetch on the calling thread, so its counters tell
+                # whether the data came over the network or from the response cache.
+                network, cache_hits = thread_request_counts()
+                try:
+                    value = planner.nodes[name](self.symbol, self)
+                finally:
+                    after = thread_request_counts()
+                    self.requested[name] = (after[0] - network, after[1] - cache_hits)
+                if value is None:
+                    self.limited = True
+                    raise LimitReached(endpoint)
+                if planner.on_endpoint_done is not None:
+                    planner.on_endpoint_done(self.symbol, endpoint, value)
+            self.values[name] = value
+        return self.values[name]
+
+    def skip(self, name, reason):
+        self.skipped[name] = reason
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        planner = self.planner
+        with planner._lock:
+            for name, endpoint in planner.endpoints.items():
+                if name in self.requested:
+                    network, cache_hits = self.requested[name]
+                    planner.calls_made[endpoint] += network
+                    if cache_hits:
+                        planner.calls_saved[(endpoint, "response cache")] += cache_hits
+                elif self.limited:
+                    continue
+                elif name in self.skipped:
+                    planner.calls_saved[(endpoint, self.skipped[name])] += 1
+                else:
+                    planner.calls_saved[(endpoint, "not needed")] += 1
+
+class OverviewFieldCache:
+    """
+    Small persistent store of the OVERVIEW fields the pipeline uses, kept much longer
+    than the full response cache so a symbol's overview is not refetched every run.
+    """
+    def __init__(self, path, fields=("MarketCapitalization",), ttl=7 * 24 * 3600):
+        self.path = path
+        self.fields = fields
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, symbol):
+        """Return the cached fields for `symbol`, or None if absent or stale."""
+        entry = self.entries.get(symbol)
+        if entry is None or time.time() - entry["stored_at"] > self.ttl:
+            return None
+        return entry["fields"]
+
+    def put(self, symbol, overview):
+        fields = {field: overview[field] for field in self.fields if overview.get(field)}
+        if not fields:
+            return
+        with self._lock:
+            self.entries[symbol] = {"stored_at": time.time(), "fields": fields}
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
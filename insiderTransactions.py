@@ -1,33 +1,30 @@
 import os
+import time
+import threading
 import datetime
+import hashlib
+import itertools
 import logging
-import requests
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from dotenv import load_dotenv
+from alphaVantageClient import (fetch_json, check_api_limit, classify_response, configure_from_env, has_daily_quota,
+                                INVALID_SYMBOL)
+from rateLimiter import QuotaExhausted
+from runCheckpoint import RunCheckpoint
+from fetchPlanner import FetchPlanner, OverviewFieldCache, LimitReached
+import metrics
+from logConfig import configure_logging, PayloadExcerpt
+from dataLake import DataLake, INSIDER_TRANSACTIONS, OVERVIEWS, insider_frame, overview_frame
+from sqliteStore import SqliteStore
+from sharedPool import SharedMemoryPool
+from pipeline import Stage, run_pipeline, DEFAULT_QUEUE_SIZE
 
-# Setup logging to file and console.
-logging.basicConfig(
-    filename='insider_trading.log',
-    level=logging.DEBUG,
-    format='%(asctime)s %(levelname)s: %(message)s'
-)
-console = logging.StreamHandler()
-console.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
-console.setFormatter(formatter)
-logging.getLogger('').addHandler(console)
-
-def check_api_limit(data, symbol, endpoint):
-    """Check if the API response indicates that the daily limit is reached."""
-    if isinstance(data, dict):
-        # Check for any key that might indicate a limit has been reached.
-        if "Note" in data or "Error Message" in data or "Information" in data:
-            message = data.get("Note") or data.get("Error Message") or data.get("Information")
-            logging.error(f"Daily API limit reached on {endpoint} for {symbol}: {message}")
-            return True
-    return False
-
+@metrics.timed("fetch_insider_transactions")
 def fetch_insider_transactions(symbol, api_key, base_url):
     """
     Fetch insider transactions for a given symbol using Alpha Vantage's INSIDER_TRANSACTIONS endpoint.
@@ -39,18 +36,20 @@ def fetch_insider_transactions(symbol, api_key, base_url):
         "apikey": api_key
     }
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        logging.debug(f"Raw insider data for {symbol}: {data}")
+        data = fetch_json(base_url, params)
+        logging.debug("Raw insider data for %s: %s", symbol, PayloadExcerpt(data))
         if check_api_limit(data, symbol, "INSIDER_TRANSACTIONS"):
             return None
-        logging.info(f"Fetched insider transactions for {symbol}.")
+        logging.info("Fetched insider transactions for %s.", symbol)
         return data.get("data", [])
+    except QuotaExhausted as e:
+        logging.error("Daily API limit reached on INSIDER_TRANSACTIONS for %s: %s", symbol, e)
+        return None
     except Exception as e:
-        logging.error(f"Error fetching insider transactions for {symbol}: {e}")
+        logging.error("Error fetching insider transactions for %s: %s", symbol, e)
         return []
 
+@metrics.timed("fetch_overview")
 def fetch_overview(symbol, api_key, base_url):
     """
     Fetch company overview for a given symbol using Alpha Vantage's OVERVIEW endpoint.
@@ -62,17 +61,67 @@ def fetch_overview(symbol, api_key, base_url):
         "apikey": api_key
     }
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(base_url, params)
         if check_api_limit(data, symbol, "OVERVIEW"):
             return None
-        logging.info(f"Fetched overview for {symbol}.")
+        if classify_response(data) == INVALID_SYMBOL:
+            return {}
+        logging.info("Fetched overview for %s.", symbol)
         return data
+    except QuotaExhausted as e:
+        logging.error("Daily API limit reached on OVERVIEW for %s: %s", symbol, e)
+        return None
     except Exception as e:
-        logging.error(f"Error fetching overview for {symbol}: {e}")
+        logging.error("Error fetching overview for %s: %s", symbol, e)
         return {}
 
+# Strings float() accepts as NaN; pd.to_numeric reports them like any other unparsable value.
+NAN_STRINGS = {"nan", "+nan", "-nan"}
+
+@metrics.timed("parse_insider_transactions")
+def parse_insider_transactions(transactions):
+    """
+    Vectorized parse of raw transaction records (a list of dicts or a DataFrame) into a
+    DataFrame with 'date' (datetime64) and 'net_value' columns, indexed like the input
+    (by position for a list). Records with invalid dates are dropped with a warning,
+    unparsable values count as 0, buys are positive and sells negative; other
+    transaction types contribute 0.
+    """
+    txns = pd.DataFrame(transactions)
+    n = len(txns)
+    empty = pd.Series([""] * n, index=txns.index, dtype=object)
+
+    raw_dates = txns["transactionDate"].fillna("") if "transactionDate" in txns else empty
+    dates = pd.to_datetime(raw_dates, format="%Y-%m-%d", errors="coerce")
+    invalid = dates.isna()
+    if invalid.any():
+        for txn_date_str in raw_dates[invalid]:
+            logging.warning("Skipping transaction with invalid date: %s", txn_date_str)
+
+    if "transactionValue" in txns:
+        raw_values = txns["transactionValue"]
+        values = pd.to_numeric(raw_values, errors="coerce")
+        # Keep genuine "nan" strings as NaN like float() does; everything else unparsable is 0.
+        failed = values.isna() & raw_values.notna()
+        nan_text = raw_values[failed].astype(str).str.strip().str.lower().isin(NAN_STRINGS)
+        values = values.fillna(0.0).astype(np.float64)
+        values[nan_text[nan_text].index] = np.nan
+        values = values.to_numpy()
+    else:
+        values = np.zeros(n)
+
+    # Derive the sign from the handful of distinct transaction types, then broadcast it.
+    raw_types = txns["transactionType"].fillna("") if "transactionType" in txns else empty
+    codes, uniques = pd.factorize(raw_types)
+    unique_types = pd.Series(uniques, dtype=object).astype(str).str.lower()
+    is_buy = unique_types.str.contains("buy", regex=False).to_numpy()[codes]
+    is_sell = unique_types.str.contains("sell", regex=False).to_numpy()[codes]
+    net_values = np.where(is_buy, values, np.where(is_sell, -values, 0.0))
+
+    valid = ~invalid.to_numpy()
+    return pd.DataFrame({"date": dates[valid].to_numpy(), "net_value": net_values[valid]}, index=txns.index[valid])
+
+@metrics.timed("compute_insider_history")
 def compute_insider_history(transactions, start_date, end_date):
     """
     Given a list of transactions, compute a daily time series of cumulative net insider value
@@ -84,76 +133,513 @@ def compute_insider_history(transactions, start_date, end_date):
       - 'transactionValue' (dollar amount).
     Buys add and sells subtract.
     """
-    records = []
-    for txn in transactions:
-        txn_date_str = txn.get("transactionDate", "")
-        try:
-            txn_date = datetime.datetime.strptime(txn_date_str, "%Y-%m-%d").date()
-        except Exception:
-            logging.warning(f"Skipping transaction with invalid date: {txn_date_str}")
-            continue
-        if txn_date < start_date or txn_date > end_date:
-            continue
-        try:
-            value = float(txn.get("transactionValue", 0))
-        except Exception:
-            value = 0.0
-        txn_type = txn.get("transactionType", "").lower()
-        if "buy" in txn_type:
-            net_value = value
-        elif "sell" in txn_type:
-            net_value = -value
-        else:
-            net_value = 0.0
-        records.append({"date": txn_date, "net_value": net_value})
-    
-    if not records:
+    if len(transactions) == 0:
+        return pd.DataFrame(columns=['date', 'net_insider'])
+    return insider_history_from_parsed(parse_insider_transactions(transactions), start_date, end_date)
+
+def insider_history_from_parsed(parsed, start_date, end_date):
+    """The second half of compute_insider_history, on the output of parse_insider_transactions."""
+    start = pd.Timestamp(start_date)
+    in_window = (parsed['date'] >= start) & (parsed['date'] <= pd.Timestamp(end_date))
+    parsed = parsed[in_window]
+    if parsed.empty:
         return pd.DataFrame(columns=['date', 'net_insider'])
     
-    df = pd.DataFrame(records)
-    # Aggregate by day.
-    daily = df.groupby('date')['net_value'].sum().reset_index()
-    daily = daily.sort_values('date')
-    
-    # Create a complete daily date range.
+    # Aggregate by day offset from start_date and scatter into a complete daily range.
     all_dates = pd.date_range(start=start_date, end=end_date)
-    daily = daily.set_index('date').reindex(all_dates, fill_value=0).rename_axis('date').reset_index()
+    offsets = (parsed['date'] - start).dt.days.to_numpy()
+    daily_sums = parsed['net_value'].groupby(offsets).sum()
+    net_value = np.zeros(len(all_dates))
+    net_value[daily_sums.index.to_numpy()] = daily_sums.to_numpy()
     # Compute cumulative net insider value.
-    daily['net_insider'] = daily['net_value'].cumsum()
-    return daily[['date', 'net_insider']]
+    net_insider = pd.Series(net_value).cumsum()
+    return pd.DataFrame({'date': all_dates, 'net_insider': net_insider.to_numpy()})
+
+# Raw transaction fields compute_insider_history reads.
+INSIDER_COLUMNS = ["transactionDate", "transactionType", "transactionValue"]
 
-def plot_insider_history(symbol, history_df, market_cap):
+# Separates fields in the text encode_insider_transactions sends to workers (ASCII unit separator).
+FIELD_SEPARATOR = "\x1f"
+
+def encode_insider_transactions(transactions):
     """
-    Plot the insider history. If market_cap is provided, plot net insider trading as a percentage
-    of market cap. Otherwise, plot the raw cumulative net insider trading in dollars.
+    The fields compute_insider_history reads, joined into one UTF-8 byte array for a
+    SharedMemoryPool worker. Joining is a few times cheaper than building a NumPy string
+    array per field, which keeps the part of the work left in the parent small. Missing
+    values become "", which parses exactly like a missing field.
+    """
+    if isinstance(transactions, pd.DataFrame):
+        transactions = transactions.reindex(columns=INSIDER_COLUMNS).astype(object)
+        transactions = transactions.where(transactions.notna(), "").to_dict("records")
+    date, kind, value = INSIDER_COLUMNS
+    text = FIELD_SEPARATOR.join([f"{txn.get(date) or ''}{FIELD_SEPARATOR}{txn.get(kind) or ''}"
+                                 f"{FIELD_SEPARATOR}{txn.get(value) or ''}" for txn in transactions])
+    if transactions and text.count(FIELD_SEPARATOR) != len(transactions) * len(INSIDER_COLUMNS) - 1:
+        # A field contains the separator itself; blank it out of the values.
+        text = FIELD_SEPARATOR.join(str(txn.get(field) or "").replace(FIELD_SEPARATOR, " ")
+                                    for txn in transactions for field in INSIDER_COLUMNS)
+    return {"text": np.frombuffer(text.encode(), dtype=np.uint8)}
+
+def _insider_history_task(arrays, start_date, end_date):
+    """Worker half of compute_insider_history, on arrays from encode_insider_transactions."""
+    text = arrays["text"]
+    fields = text.tobytes().decode().split(FIELD_SEPARATOR) if len(text) else []
+    transactions = pd.DataFrame({field: pd.Series(fields[i::len(INSIDER_COLUMNS)], dtype=object)
+                                 for i, field in enumerate(INSIDER_COLUMNS)})
+    return compute_insider_history(transactions, start_date, end_date)
+
+def compute_insider_histories(transactions_by_symbol, start_date, end_date, pool=None):
+    """
+    compute_insider_history for many symbols, given as {symbol: transactions}. With a
+    SharedMemoryPool the transactions reach the workers through one shared-memory block.
+    Returns {symbol: history frame} in the input order.
+    """
+    if pool is None:
+        return {symbol: compute_insider_history(transactions, start_date, end_date)
+                for symbol, transactions in transactions_by_symbol.items()}
+    arrays = [encode_insider_transactions(transactions) for transactions in transactions_by_symbol.values()]
+    return dict(zip(transactions_by_symbol, pool.map(_insider_history_task, arrays, start_date, end_date)))
+
+# Trailing windows, in days, that insider_flow_matrix reports by default.
+INSIDER_FLOW_WINDOWS = (30, 90, 180, 365)
+
+# Symbols per block of insider_flow_matrix's symbols x days scratch matrix, bounding its memory.
+FLOW_SYMBOL_BLOCK = 4096
+
+@metrics.timed("insider_flow_matrix")
+def insider_flow_matrix(transactions_by_symbol, windows=INSIDER_FLOW_WINDOWS, as_of=None):
+    """
+    Net insider value of many symbols over several trailing windows, as a symbols x
+    windows DataFrame whose columns are the window lengths in days. Column w equals the
+    last value of compute_insider_history(transactions, as_of - w days, as_of) (0 when
+    it is empty), up to floating-point rounding; as_of defaults to today.
+
+    The whole universe is parsed in one call. Transactions are summed into a symbols x
+    days-before-as_of matrix whose running sum along the days answers every window at
+    once, in blocks of FLOW_SYMBOL_BLOCK symbols.
+    """
+    symbols = list(transactions_by_symbol)
+    windows = list(windows)
+    as_of = np.datetime64(as_of or datetime.date.today(), "D")
+    flows = np.zeros((len(symbols), len(windows)))
+    records = [transactions.to_dict("records") if isinstance(transactions, pd.DataFrame) else transactions
+               for transactions in transactions_by_symbol.values()]
+    lengths = [len(transactions) for transactions in records]
+    if sum(lengths):
+        parsed = parse_insider_transactions(list(itertools.chain.from_iterable(records)))
+        codes = np.repeat(np.arange(len(symbols)), lengths)[parsed.index.to_numpy()]
+        ages = (as_of - parsed["date"].to_numpy().astype("datetime64[D]")).astype(np.int64)
+        n_days = max(windows) + 1
+        keep = (ages >= 0) & (ages < n_days)
+        # NaN values count as nothing, as in compute_insider_history's daily sums.
+        codes, ages, values = codes[keep], ages[keep], np.nan_to_num(parsed["net_value"].to_numpy()[keep])
+        # Codes are ascending, so each block of symbols is a contiguous run of transactions.
+        bounds = np.searchsorted(codes, np.arange(0, len(symbols) + FLOW_SYMBOL_BLOCK, FLOW_SYMBOL_BLOCK))
+        for block, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+            first = block * FLOW_SYMBOL_BLOCK
+            n = min(FLOW_SYMBOL_BLOCK, len(symbols) - first)
+            if n <= 0:
+                break
+            daily = np.bincount((codes[lo:hi] - first) * n_days + ages[lo:hi], weights=values[lo:hi],
+                                minlength=n * n_days).reshape(n, n_days)
+            flows[first:first + n] = np.cumsum(daily, axis=1)[:, windows]
+    return pd.DataFrame(flows, index=pd.Index(symbols, name="symbol"), columns=windows)
+
+def load_insider_history(lake, symbol, start_date, end_date):
+    """
+    compute_insider_history over the transactions stored in `lake`, without touching the
+    network. Only the needed columns and the rows dated inside the window are read.
+    """
+    stored = lake.read(INSIDER_TRANSACTIONS, symbol, columns=INSIDER_COLUMNS, start=start_date, end=end_date)
+    return compute_insider_history(stored, start_date, end_date)
+
+def transaction_fingerprints(transactions):
+    """A stable 64-bit hash of each raw transaction record, over its fields as returned by the API."""
+    return pd.util.hash_array(np.array(list(map(repr, transactions)), dtype=object))
+
+class IncrementalInsiderHistory:
     """
-    plt.figure(figsize=(10, 6))
+    compute_insider_history maintained incrementally across runs, one state file per
+    symbol under `directory`.
+
+    A symbol's state is the window it covers, the net flow and transaction count of
+    each day in it, the cumulative net value at its last day, the parsed transactions
+    dated after it, and fingerprints of every record already parsed. update() rolls the
+    window forward to the new end date, subtracting the days that aged out, then parses
+    and applies only the records it has not seen.
+
+    INSIDER_TRANSACTIONS lists the newest records first, so when the previous response's
+    first record sits right behind as many new ones as the response grew by, its last
+    record is still last and none of the records in front of it was parsed before, only
+    that prefix is parsed; records slipped in lower down in that case go unnoticed.
+    Otherwise every record is fingerprinted and compared against the stored ones.
+
+    Each update still pays a fixed cost for parsing the new records and for loading and
+    rewriting the state file, which grows with the number of records seen. That is about
+    what compute_insider_history costs on a few hundred transactions, so the state only
+    pays off for symbols with long histories (thousands of transactions). The
+    result equals compute_insider_history up to floating-point rounding when one day's
+    transactions arrive across several runs; records that disappear from the API are
+    not retracted. A window of a different length, or one starting earlier than the
+    stored state, rebuilds the state from scratch.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def state_path(self, symbol):
+        return os.path.join(self.directory, f"{symbol}.npz")
+
+    def load(self, symbol):
+        """The stored state as a dict of arrays, or None."""
+        path = self.state_path(symbol)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {key: data[key] for key in data.files}
+
+    def save(self, symbol, state):
+        path = self.state_path(symbol)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **state)
+        os.replace(tmp_path, path)
+
+    def net_insider(self, symbol):
+        """Cumulative net insider value over the stored window, without rebuilding the series."""
+        state = self.load(symbol)
+        return None if state is None else float(state["cumulative"])
+
+    @metrics.timed("update_insider_history")
+    def update(self, symbol, transactions, start_date, end_date):
+        """
+        Apply `transactions` (the symbol's full INSIDER_TRANSACTIONS list, as returned by
+        the API) to the stored state for the start_date..end_date window, persist it and
+        return the same frame compute_insider_history would.
+        """
+        if isinstance(transactions, pd.DataFrame):
+            transactions = transactions.to_dict("records")
+        start = np.datetime64(start_date, "D")
+        end = np.datetime64(end_date, "D")
+        n_days = int((end - start).astype(np.int64)) + 1
+        state = self.load(symbol)
+        if state is None or len(state["flows"]) != n_days or state["start"] > start:
+            state = {
+                "start": start,
+                "flows": np.zeros(n_days),
+                # Transactions per day; a window without any has an empty history.
+                "counts": np.zeros(n_days, dtype=np.int64),
+                "cumulative": np.float64(0.0),
+                # Parsed transactions dated after the window, applied once it reaches them.
+                "pending_dates": np.array([], dtype="datetime64[D]"),
+                "pending_values": np.array([]),
+                # Sorted fingerprints of the parsed records (repeated for identical records),
+                # plus the size, first and last record of the last response.
+                "seen": np.array([], dtype=np.uint64),
+                "total": np.int64(0),
+                "head": np.str_(""),
+                "tail": np.str_(""),
+            }
+            changed = True
+        else:
+            changed = state["start"] != start
+            self._roll(state, start, end)
+
+        new = self._new_records(state, transactions)
+        if new:
+            self._apply(state, new, start, end)
+            changed = True
+        # An empty response (an outage or a throttled call) keeps the previous response's
+        # markers, so the next run still recognises the records it has already applied.
+        if len(transactions):
+            head, tail = repr(transactions[0]), repr(transactions[-1])
+            if (state["total"], state["head"], state["tail"]) != (len(transactions), head, tail):
+                state["total"] = np.int64(len(transactions))
+                state["head"], state["tail"] = np.str_(head), np.str_(tail)
+                changed = True
+        if changed:
+            self.save(symbol, state)
+        if not state["counts"].any():
+            return pd.DataFrame(columns=['date', 'net_insider'])
+        return pd.DataFrame({'date': pd.date_range(start=start_date, end=end_date),
+                             'net_insider': pd.Series(state["flows"]).cumsum().to_numpy()})
+
+    def _new_records(self, state, transactions):
+        """The records of `transactions` not parsed before."""
+        if len(state["seen"]) == 0:
+            return transactions
+        total, n = int(state["total"]), len(transactions)
+        if 0 < total <= n and (repr(transactions[n - total]) == state["head"]
+                               and repr(transactions[-1]) == state["tail"]):
+            # The markers can also match when the old first record was repeated on top;
+            # trust the prefix only if none of its records has been parsed before.
+            prefix = transactions[:n - total]
+            seen = state["seen"]
+            fingerprints = transaction_fingerprints(prefix) if prefix else np.array([], dtype=np.uint64)
+            positions = np.minimum(np.searchsorted(seen, fingerprints), len(seen) - 1)
+            if not (seen[positions] == fingerprints).any():
+                return prefix
+        # The response changed other than by new records on top: compare every record,
+        # counting identical records, against the stored fingerprints.
+        fingerprints = transaction_fingerprints(transactions)
+        rank = pd.Series(fingerprints).groupby(fingerprints).cumcount().to_numpy()
+        stored = np.searchsorted(state["seen"], fingerprints, "right") - np.searchsorted(state["seen"], fingerprints)
+        return [transactions[i] for i in np.flatnonzero(rank >= stored)]
+
+    def _roll(self, state, start, end):
+        """Move the window forward to start..end, dropping the days that age out."""
+        days = int((start - state["start"]).astype(np.int64))
+        if days:
+            flows, counts = state["flows"], state["counts"]
+            kept = max(len(flows) - days, 0)
+            state["cumulative"] = state["cumulative"] - flows[:days].sum()
+            state["flows"] = np.concatenate([flows[days:], np.zeros(len(flows) - kept)])
+            state["counts"] = np.concatenate([counts[days:], np.zeros(len(counts) - kept, dtype=counts.dtype)])
+            state["start"] = start
+        due = state["pending_dates"] <= end
+        if due.any():
+            dates, values = state["pending_dates"][due], state["pending_values"][due]
+            state["pending_dates"], state["pending_values"] = state["pending_dates"][~due], state["pending_values"][~due]
+            self._add_flows(state, dates, values, start)
+
+    def _add_flows(self, state, dates, values, start):
+        in_window = dates >= start
+        if not in_window.any():
+            return
+        offsets = (dates[in_window] - start).astype(np.int64)
+        daily_sums = pd.Series(values[in_window]).groupby(offsets).sum()
+        state["flows"][daily_sums.index.to_numpy()] += daily_sums.to_numpy()
+        np.add.at(state["counts"], offsets, 1)
+        state["cumulative"] = state["cumulative"] + daily_sums.sum()
+
+    def _apply(self, state, records, start, end):
+        """Parse `records`, add the flows of those dated in the window and remember them all."""
+        parsed = parse_insider_transactions(records)
+        dates = parsed["date"].to_numpy().astype("datetime64[D]")
+        values = parsed["net_value"].to_numpy()
+        later = dates > end
+        state["pending_dates"] = np.concatenate([state["pending_dates"], dates[later]])
+        state["pending_values"] = np.concatenate([state["pending_values"], values[later]])
+        self._add_flows(state, dates[~later], values[~later], start)
+        fingerprints = np.sort(transaction_fingerprints(records))
+        state["seen"] = np.insert(state["seen"], np.searchsorted(state["seen"], fingerprints), fingerprints)
+
+# Bump when the plot layout changes so cached images are re-rendered.
+PLOT_VERSION = 1
+
+def insider_plot_filename(symbol, market_cap):
+    if market_cap is not None:
+        return f"insider_history_{symbol}.png"
+    return f"insider_history_{symbol}_raw.png"
+
+def plot_digest(symbol, history_df, market_cap, fast=False):
+    """
+    Hash the inputs of an insider plot: the days on which net insider value changed
+    (and by how much), the market cap and the plotting parameters. Days without
+    activity are left out, so a window that merely rolls forward keeps the same hash.
+    """
+    flows = history_df['net_insider'].diff().fillna(history_df['net_insider'])
+    active = history_df.loc[flows != 0, ['date']].assign(flow=flows[flows != 0])
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(active, index=False).to_numpy().tobytes())
+    digest.update(repr((symbol, market_cap, fast, PLOT_VERSION)).encode())
+    return digest.hexdigest()
+
+def plot_is_current(filename, digest):
+    """True if `filename` exists and was rendered from inputs with this digest."""
+    try:
+        with open(f"{filename}.sha256") as f:
+            return f.read().strip() == digest and os.path.exists(filename)
+    except OSError:
+        return False
+
+def write_plot_digest(filename, digest):
+    with open(f"{filename}.sha256", "w") as f:
+        f.write(digest)
+
+def draw_insider_history(ax, symbol, history_df, market_cap, fast=False):
+    """
+    Draw the insider history onto `ax` and return the file name it should be saved as.
+    With `fast`, per-point markers are dropped and the line is rasterized.
+    """
+    style = {'linestyle': '-'}
+    if fast:
+        style['rasterized'] = True
+    else:
+        style['marker'] = 'o'
     if market_cap is not None:
         # Calculate the ratio (percentage).
-        history_df['ratio'] = history_df['net_insider'] / market_cap * 100
-        plt.plot(history_df['date'], history_df['ratio'], marker='o', linestyle='-')
-        plt.title(f"Net Insider Trading as % of Market Cap for {symbol}")
-        plt.ylabel("Net Insider Trading (% of Market Cap)")
-        filename = f"insider_history_{symbol}.png"
+        ratio = history_df['net_insider'] / market_cap * 100
+        ax.plot(history_df['date'], ratio, **style)
+        ax.set_title(f"Net Insider Trading as % of Market Cap for {symbol}")
+        ax.set_ylabel("Net Insider Trading (% of Market Cap)")
     else:
         # Plot raw net insider trading.
-        plt.plot(history_df['date'], history_df['net_insider'], marker='o', linestyle='-')
-        plt.title(f"Cumulative Net Insider Trading for {symbol}")
-        plt.ylabel("Cumulative Net Insider Trading (USD)")
-        filename = f"insider_history_{symbol}_raw.png"
-    
-    plt.xlabel("Date")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(filename)
-    plt.close()
-    logging.info(f"Saved plot for {symbol} as {filename}.")
+        ax.plot(history_df['date'], history_df['net_insider'], **style)
+        ax.set_title(f"Cumulative Net Insider Trading for {symbol}")
+        ax.set_ylabel("Cumulative Net Insider Trading (USD)")
+    ax.set_xlabel("Date")
+    ax.grid(True)
+    return insider_plot_filename(symbol, market_cap)
+
+@metrics.timed("plot_insider_history")
+def plot_insider_history(symbol, history_df, market_cap, fast=False, skip_unchanged=False):
+    """
+    Plot the insider history. If market_cap is provided, plot net insider trading as a percentage
+    of market cap. Otherwise, plot the raw cumulative net insider trading in dollars.
+    With skip_unchanged, the plot is not redrawn when its inputs hash to the digest stored
+    next to the existing image.
+    """
+    if skip_unchanged:
+        filename = insider_plot_filename(symbol, market_cap)
+        digest = plot_digest(symbol, history_df, market_cap, fast)
+        if plot_is_current(filename, digest):
+            logging.info("Plot for %s is unchanged; keeping %s.", symbol, filename)
+            return filename
+    fig = plt.figure(figsize=(10, 6))
+    filename = draw_insider_history(fig.gca(), symbol, history_df, market_cap, fast)
+    fig.tight_layout()
+    fig.savefig(filename)
+    plt.close(fig)
+    if skip_unchanged:
+        write_plot_digest(filename, digest)
+    logging.info("Saved plot for %s as %s.", symbol, filename)
     return filename
 
+# Figure reused by every plot rendered in a render worker process.
+_worker_figure = None
+
+def _render_plot(symbol, history_df, market_cap, fast):
+    """Render one plot on this process's reusable Agg figure."""
+    global _worker_figure
+    if _worker_figure is None:
+        _worker_figure = Figure(figsize=(10, 6))
+        FigureCanvasAgg(_worker_figure)
+        _worker_figure.add_subplot()
+    ax = _worker_figure.axes[0]
+    ax.clear()
+    filename = draw_insider_history(ax, symbol, history_df, market_cap, fast)
+    _worker_figure.tight_layout()
+    _worker_figure.savefig(filename)
+    return filename
+
+# Checkpoint entry recorded once a symbol has been fully processed.
+SYMBOL_DONE = "DONE"
+
+def parse_market_cap(symbol, overview):
+    """Return the overview's market cap as a float, or None (with a warning) if missing or invalid."""
+    market_cap_str = overview.get("MarketCapitalization")
+    if not market_cap_str:
+        logging.warning("Market cap not available for %s. Will plot raw net insider trading.", symbol)
+        print(f"Market cap not available for {symbol}. Will plot raw net insider trading.")
+        return None
+    try:
+        return float(market_cap_str)
+    except Exception:
+        logging.error("Invalid market cap for %s: %s. Will plot raw net insider trading.", symbol, market_cap_str)
+        print(f"Invalid market cap for {symbol}. Will plot raw net insider trading.")
+        return None
+
+def build_insider_planner(api_key, base_url, start_date, end_date, field_cache=None, lake=None, store=None,
+                          compute_pool=None, incremental=None):
+    """
+    Dependency graph for one symbol: plot inputs need the insider history, which needs
+    INSIDER_TRANSACTIONS; the market cap needs OVERVIEW, but only once the history turns
+    out to be non-empty and only if `field_cache` has no fresh market cap for the symbol.
+    Fetched transactions and overviews are also appended to `lake` and written to the
+    SQLite `store` when those are given. With an IncrementalInsiderHistory as
+    `incremental`, the history is updated from its stored state; otherwise, with a
+    SharedMemoryPool as `compute_pool`, it is computed in a worker process.
+    """
+    planner = FetchPlanner()
+
+    def transactions(symbol, need):
+        result = fetch_insider_transactions(symbol, api_key, base_url)
+        if lake is not None and result:
+            # INSIDER_TRANSACTIONS returns the symbol's whole history, so it replaces the partition.
+            lake.replace(INSIDER_TRANSACTIONS, symbol, insider_frame(result))
+        if store is not None and result:
+            store.replace_insider_transactions(symbol, parse_insider_transactions(result))
+        return result
+
+    def overview(symbol, need):
+        result = fetch_overview(symbol, api_key, base_url)
+        if lake is not None and result:
+            lake.append(OVERVIEWS, symbol, overview_frame(result))
+        if store is not None and result:
+            store.write_overview(symbol, result)
+        return result
+
+    planner.add("transactions", transactions, endpoint="INSIDER_TRANSACTIONS")
+    planner.add("overview", overview, endpoint="OVERVIEW")
+
+    def parsed(symbol, need):
+        transactions = need("transactions")
+        return parse_insider_transactions(transactions) if len(transactions) else None
+
+    def history(symbol, need):
+        transactions = need("transactions")
+        if incremental is not None:
+            return incremental.update(symbol, transactions, start_date, end_date)
+        if len(transactions) == 0:
+            return pd.DataFrame(columns=['date', 'net_insider'])
+        if compute_pool is not None:
+            return compute_pool.submit(_insider_history_task, encode_insider_transactions(transactions),
+                                       start_date, end_date).result()
+        return insider_history_from_parsed(need("parsed"), start_date, end_date)
+
+    planner.add("parsed", parsed)
+    planner.add("history", history)
+
+    def market_cap(symbol, need):
+        if need("history").empty:
+            return None
+        overview = field_cache.get(symbol) if field_cache is not None else None
+        if overview is not None:
+            need.skip("overview", "field cache")
+        else:
+            overview = need("overview")
+            if field_cache is not None:
+                field_cache.put(symbol, overview)
+        return parse_market_cap(symbol, overview)
+
+    planner.add("market_cap", market_cap)
+    planner.add("plot_inputs", lambda symbol, need: (need("history"), need("market_cap")))
+    return planner
+
 def main():
+    run_start = time.perf_counter()
     load_dotenv()
+    # Log to insider_trading.log and the console; LOG_LEVEL=DEBUG adds payload excerpts.
+    configure_logging(log_file='insider_trading.log')
+    configure_from_env()
     api_key = os.getenv("API_TOKEN")
     base_url = os.getenv("BASE_URL", "https://www.alphavantage.co/query")
+    # Concurrency of each pipeline stage: MAX_WORKERS threads per network stage,
+    # PARSE_WORKERS parser threads, COMPUTE_WORKERS compute processes (threads in this
+    # process when 1) and PLOT_WORKERS render processes; PIPELINE_QUEUE_SIZE bounds
+    # the queue in front of each stage.
+    max_workers = int(os.getenv("MAX_WORKERS", "1"))
+    parse_workers = int(os.getenv("PARSE_WORKERS", "1"))
+    plot_workers = int(os.getenv("PLOT_WORKERS", "1"))
+    queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+    fast_plots = os.getenv("FAST_PLOTS", "").lower() in ("1", "true", "yes")
+    # Plots whose inputs are unchanged since the last run are kept; FORCE_PLOTS=1 redraws them all.
+    skip_unchanged = os.getenv("FORCE_PLOTS", "").lower() not in ("1", "true", "yes")
+    # RESUME=1 continues a run that stopped on the API limit instead of starting over.
+    resume = os.getenv("RESUME", "").lower() in ("1", "true", "yes")
+    checkpoint_file = os.getenv("CHECKPOINT_FILE", "insider_checkpoint.jsonl")
+    # Market caps are reused for a week from this file; set it to an empty string to disable.
+    overview_fields_file = os.getenv("OVERVIEW_FIELDS_FILE", "overview_fields.json")
+    # DATA_LAKE_DIR keeps every fetched transaction and overview in a local columnar store.
+    lake_dir = os.getenv("DATA_LAKE_DIR", "")
+    # SQLITE_DB writes transactions and overviews to an SQLite file for ad-hoc queries.
+    sqlite_db = os.getenv("SQLITE_DB", "")
+    # COMPUTE_WORKERS > 1 computes histories in worker processes fed through shared memory.
+    compute_workers = int(os.getenv("COMPUTE_WORKERS", "1"))
+    # INSIDER_STATE_DIR keeps per-symbol history state so each run applies only new transactions;
+    # worthwhile when symbols have thousands of transactions, not for short histories.
+    insider_state_dir = os.getenv("INSIDER_STATE_DIR", "")
     symbols_str = os.getenv("SYMBOLS", "")
     if not symbols_str:
         logging.error("No symbols provided in .env. Please add a SYMBOLS variable (comma-separated).")
@@ -165,46 +651,156 @@ def main():
     end_date = datetime.date.today()
     start_date = end_date - datetime.timedelta(days=365)
     
-    for symbol in symbols:
-        logging.info(f"Processing {symbol}...")
+    checkpoint = RunCheckpoint(checkpoint_file, resume=resume)
+    pending = [symbol for symbol in symbols if not checkpoint.is_done(symbol, SYMBOL_DONE)]
+    if len(pending) < len(symbols):
+        logging.info("Resuming: %s symbols already processed.", len(symbols) - len(pending))
+        print(f"Resuming: {len(symbols) - len(pending)} symbols already processed.")
+    
+    field_cache = OverviewFieldCache(overview_fields_file) if overview_fields_file else None
+    lake = DataLake(lake_dir) if lake_dir else None
+    store = SqliteStore(sqlite_db) if sqlite_db else None
+    incremental = IncrementalInsiderHistory(insider_state_dir) if insider_state_dir else None
+    compute_pool = SharedMemoryPool(compute_workers) if compute_workers > 1 and incremental is None else None
+    plot_pool = ProcessPoolExecutor(max_workers=plot_workers) if plot_workers > 1 else None
+    planner = build_insider_planner(api_key, base_url, start_date, end_date, field_cache, lake, store, compute_pool,
+                                    incremental)
+    # Endpoint payloads go into the checkpoint, so a resumed run does not request them again.
+    planner.on_endpoint_done = checkpoint.mark_done
+    planner.restore = checkpoint.payload
+    limit = threading.Event()
+    started = {}
+    # Under a daily quota only as many symbols as there are fetch threads may still need
+    # API calls, so the fetch stage does not spend the quota on symbols that cannot finish.
+    in_flight = threading.Semaphore(max_workers) if has_daily_quota() else None
+    calling = set()
+
+    def done_calling(symbol):
+        """The symbol makes no more API calls; let the fetch stage start another one."""
+        try:
+            calling.remove(symbol)
+        except KeyError:
+            return
+        in_flight.release()
+
+    def advance(session, name):
+        """Evaluate `name` for the session's symbol; on the API limit, stop feeding symbols."""
+        try:
+            session(name)
+        except LimitReached:
+            session.finish()
+            done_calling(session.symbol)
+            started.pop(session.symbol, None)
+            if not limit.is_set():
+                limit.set()
+                logging.error("Daily API limit reached. Stopping further processing.")
+                print("Daily API limit reached. Finishing the symbols that need no further API calls.")
+            return None
+        return session
+
+    def fetch(symbol):
+        if in_flight is not None:
+            while not in_flight.acquire(timeout=0.5):
+                if limit.is_set():
+                    return None
+            calling.add(symbol)
+        if limit.is_set():
+            # Symbols already queued when the limit was hit are left for the next run.
+            done_calling(symbol)
+            return None
+        logging.info("Processing %s...", symbol)
         print(f"Processing {symbol}...")
-        
-        # Fetch insider transactions.
-        transactions = fetch_insider_transactions(symbol, api_key, base_url)
-        if transactions is None:
-            logging.error("Daily API limit reached while fetching insider transactions. Stopping further processing.")
-            print("Daily API limit reached while fetching insider transactions. Exiting script.")
-            return  # Exit the script immediately.
-        
-        # Fetch company overview.
-        overview = fetch_overview(symbol, api_key, base_url)
-        if overview is None:
-            logging.error("Daily API limit reached while fetching company overview. Stopping further processing.")
-            print("Daily API limit reached while fetching company overview. Exiting script.")
-            return  # Exit the script immediately.
-        
-        market_cap_str = overview.get("MarketCapitalization")
-        if not market_cap_str:
-            logging.warning(f"Market cap not available for {symbol}. Will plot raw net insider trading.")
-            print(f"Market cap not available for {symbol}. Will plot raw net insider trading.")
-            market_cap = None
+        started[symbol] = time.perf_counter()
+        return advance(planner.start(symbol), "transactions")
+
+    def parse(session):
+        # A compute pool's workers and the incremental history parse transactions themselves.
+        if compute_pool is not None or incremental is not None:
+            return session
+        return advance(session, "parsed")
+
+    def compute(session):
+        if advance(session, "history") is None:
+            return None
+        if session.values["history"].empty:
+            logging.info("No insider transaction data for %s in the past year.", session.symbol)
+            print(f"No insider transaction data for {session.symbol} in the past year.")
+            finish(session)
+            return None
+        return session
+
+    def overview(session):
+        if limit.is_set():
+            # Left for the next run, which reads its transactions back from the checkpoint.
+            session.finish()
+            done_calling(session.symbol)
+            started.pop(session.symbol, None)
+            return None
+        session = advance(session, "market_cap")
+        if session is not None:
+            done_calling(session.symbol)
+        return session
+
+    def render(session):
+        symbol = session.symbol
+        history_df, market_cap = session.values["history"], session.values["market_cap"]
+        filename = insider_plot_filename(symbol, market_cap)
+        digest = plot_digest(symbol, history_df, market_cap, fast_plots) if skip_unchanged else None
+        if skip_unchanged and plot_is_current(filename, digest):
+            logging.info("Plot for %s is unchanged; keeping %s.", symbol, filename)
         else:
-            try:
-                market_cap = float(market_cap_str)
-            except Exception:
-                logging.error(f"Invalid market cap for {symbol}: {market_cap_str}. Will plot raw net insider trading.")
-                print(f"Invalid market cap for {symbol}. Will plot raw net insider trading.")
-                market_cap = None
-        
-        history_df = compute_insider_history(transactions, start_date, end_date)
-        if history_df.empty:
-            logging.info(f"No insider transaction data for {symbol} in the past year.")
-            print(f"No insider transaction data for {symbol} in the past year.")
-            continue
-        
-        plot_insider_history(symbol, history_df, market_cap)
-        logging.info(f"Finished processing {symbol}.")
+            with metrics.timer("stage_seconds", stage="render_plot"):
+                if plot_pool is not None:
+                    plot_pool.submit(_render_plot, symbol, history_df, market_cap, fast_plots).result()
+                else:
+                    _render_plot(symbol, history_df, market_cap, fast_plots)
+            if skip_unchanged:
+                write_plot_digest(filename, digest)
+            logging.info("Saved plot for %s as %s.", symbol, filename)
+        finish(session)
+        logging.info("Finished processing %s.", symbol)
         print(f"Finished processing {symbol}.")
+        return filename
+
+    def finish(session):
+        done_calling(session.symbol)
+        checkpoint.mark_done(session.symbol, SYMBOL_DONE)
+        session.finish()
+        metrics.observe("symbol_seconds", time.perf_counter() - started.pop(session.symbol))
+
+    # Each stage runs concurrently with the others; bounded queues between them keep
+    # at most a few symbols in flight per stage.
+    stages = [
+        Stage("fetch", fetch, max_workers),
+        Stage("parse", parse, parse_workers),
+        Stage("compute", compute, compute_workers),
+        Stage("overview", overview, max_workers),
+        Stage("render", render, plot_workers),
+    ]
+    try:
+        run_pipeline(pending, stages, queue_size=queue_size, stop=limit)
+    finally:
+        if plot_pool is not None:
+            plot_pool.shutdown()
+        if compute_pool is not None:
+            compute_pool.shutdown()
+    limit_reached = limit.is_set()
+
+    if field_cache is not None:
+        field_cache.save()
+    if store is not None:
+        store.close()
+    logging.info(planner.report())
+    print(planner.report())
+    metrics.registry.set("run_seconds", time.perf_counter() - run_start)
+    metrics_dir = metrics.write_metrics_from_env("insider_transactions")
+    if metrics_dir:
+        logging.info("Wrote run metrics to %s.", metrics_dir)
+    if limit_reached:
+        logging.info("Progress saved to %s; rerun with RESUME=1 to continue.", checkpoint_file)
+        print(f"Progress saved to {checkpoint_file}; rerun with RESUME=1 to continue.")
+    else:
+        checkpoint.clear()
 
 if __name__ == "__main__":
     main()
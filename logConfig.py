@@ -0,0 +1,81 @@
+import os
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s %(levelname)s: %(message)s'
+
+# Longest payload excerpt written to the debug log.
+DEFAULT_PAYLOAD_CHARS = 500
+
+_listener = None
+_atexit_registered = False
+
+def configure_logging(level=None, log_file=None, console=True):
+    """
+    Route the root logger through a queue so file and console output happen on a
+    background listener thread instead of the calling thread.
+
+    `level` defaults to LOG_LEVEL (INFO if unset); `log_file` can be overridden with
+    LOG_FILE, where an empty value disables the file. Records below the level are
+    dropped before their message is ever formatted, so callers should pass arguments
+    lazily (logging.debug("... %s", value)) rather than pre-formatting them.
+    Calling it again replaces the previous configuration.
+    """
+    global _listener, _atexit_registered
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    log_file = os.getenv("LOG_FILE", log_file)
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    log_queue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+    _listener = QueueListener(log_queue, *handlers)
+    _listener.start()
+    if not _atexit_registered:
+        atexit.register(stop_logging)
+        _atexit_registered = True
+    return _listener
+
+def stop_logging():
+    """Flush queued records to their handlers and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+class PayloadExcerpt:
+    """
+    Lazy, truncated rendering of an API payload for log messages: the payload is only
+    serialized if the record is actually emitted, and at most `limit` characters of it.
+    """
+    __slots__ = ("payload", "limit")
+
+    def __init__(self, payload, limit=DEFAULT_PAYLOAD_CHARS):
+        self.payload = payload
+        self.limit = limit
+
+    def __str__(self):
+        try:
+            text = json.dumps(self.payload, default=str)
+        except (TypeError, ValueError):
+            text = repr(self.payload)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... ({len(text)} chars)"
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style (not thread-safe; the registry locks)."""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound), ...] ending with +Inf."""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process store of counters, gauges and histograms, each keyed by
+    metric name and a set of labels. Snapshots go out as JSON or in the Prometheus
+    text exposition format read by node_exporter's textfile collector.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the wall time of the with-block, in seconds, in histogram `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """Plain-dict copy of every series, suitable for json.dump."""
+        def series(items, value):
+            return [{"name": name, "labels": dict(labels), **value(v)} for (name, labels), v in sorted(items)]
+        with self._lock:
+            return {
+                "counters": series(self.counters.items(), lambda v: {"value": v}),
+                "gauges": series(self.gauges.items(), lambda v: {"value": v}),
+                "histograms": series(self.histograms.items(), lambda h: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "buckets": [[_format_bound(bound), count] for bound, count in h.cumulative()],
+                }),
+            }
+
+    def to_prometheus(self, **extra_labels):
+        """Render every series in the Prometheus text format, adding `extra_labels` to each."""
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{name}{_format_labels(labels, extra_labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                header(name, "gauge")
+                lines.append(f"{name}{_format_labels(labels, extra_labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                header(name, "histogram")
+                for bound, count in histogram.cumulative():
+                    bucket_labels = _format_labels(labels + (("le", _format_bound(bound)),), extra_labels)
+                    lines.append(f"{name}_bucket{bucket_labels} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels, extra_labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(labels, extra_labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+def _format_labels(labels, extra_labels):
+    pairs = list(extra_labels.items()) + list(labels)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+def _write_atomic(path, text):
+    # The textfile collector may read at any moment, so never expose a half-written file.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+# Process-wide registry used by the fetchers, parsers and plotting code.
+registry = MetricsRegistry()
+registry.describe("av_api_calls_total", "Alpha Vantage HTTP requests made, by endpoint and response kind.")
+registry.describe("av_cache_hits_total", "Responses served from the on-disk response cache, by endpoint.")
+registry.describe("av_bytes_downloaded_total", "Response body bytes downloaded from Alpha Vantage, by endpoint.")
+registry.describe("av_request_seconds", "Latency of individual Alpha Vantage HTTP requests, by endpoint.")
+registry.describe("stage_seconds", "Wall time of pipeline stages, by stage.")
+registry.describe("symbol_seconds", "Wall time spent fetching and preparing each symbol.")
+registry.describe("run_seconds", "Wall time of the whole run.")
+
+inc = registry.inc
+observe = registry.observe
+timer = registry.timer
+
+def timed(stage):
+    """Decorator recording each call's wall time in stage_seconds{stage=...}."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with registry.timer("stage_seconds", stage=stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def write_metrics(directory, job):
+    """
+    Write the registry to <directory>/<job>.json and <directory>/<job>.prom.
+    Every Prometheus series carries a job label so several scripts can share one
+    textfile-collector directory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    snapshot = dict(job=job, written_at=time.time(), **registry.snapshot())
+    _write_atomic(os.path.join(directory, f"{job}.json"), json.dumps(snapshot, indent=2))
+    _write_atomic(os.path.join(directory, f"{job}.prom"), registry.to_prometheus(job=job))
+
+def write_metrics_from_env(job):
+    """Write the metrics if METRICS_DIR is set; returns the directory written to, or None."""
+    directory = os.getenv("METRICS_DIR")
+    if directory:
+        write_metrics(directory, job)
+    return directory or None
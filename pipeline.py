@@ -0,0 +1,86 @@
+import queue
+import threading
+
+# Default capacity of the queue in front of each stage.
+DEFAULT_QUEUE_SIZE = 8
+
+_END = object()
+
+class Stage:
+    """
+    One step of a streaming pipeline: fn(item) runs on `workers` threads and returns the
+    item for the next stage, or None to drop it.
+    """
+    def __init__(self, name, fn, workers=1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+
+def run_pipeline(items, stages, queue_size=DEFAULT_QUEUE_SIZE, stop=None):
+    """
+    Stream `items` through `stages`, connected by bounded queues, and return what the last
+    stage produced (in completion order).
+
+    Every stage works concurrently with the others, so the run takes about as long as
+    its slowest stage rather than the sum of all of them. A full queue blocks the stage
+    feeding it, which keeps at most roughly queue_size items in flight per stage
+    however long the input is. Setting the `stop` event stops feeding new items; items
+    already inside the pipeline still flow through. If a stage raises, feeding stops,
+    the pipeline drains and the first exception is re-raised.
+    """
+    stop = stop or threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    results = []
+    errors = []
+    lock = threading.Lock()
+    remaining = [stage.workers for stage in stages]
+
+    def feed():
+        for item in items:
+            if stop.is_set():
+                break
+            queues[0].put(item)
+        for _ in range(stages[0].workers):
+            queues[0].put(_END)
+
+    def work(index):
+        stage = stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        while True:
+            item = inbox.get()
+            if item is _END:
+                break
+            try:
+                item = stage.fn(item)
+            except BaseException as e:
+                with lock:
+                    errors.append(e)
+                stop.set()
+                continue
+            if item is None:
+                continue
+            if outbox is not None:
+                outbox.put(item)
+            else:
+                with lock:
+                    results.append(item)
+        with lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        # The last worker out of a stage passes the end marker on to the next one.
+        if last and outbox is not None:
+            for _ in range(stages[index + 1].workers):
+                outbox.put(_END)
+
+    threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+    for index, stage in enumerate(stages):
+        threads += [threading.Thread(target=work, args=(index,), name=f"pipeline-{stage.name}-{n}", daemon=True)
+                    for n in range(stage.workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
@@ -0,0 +1,131 @@
+import os
+import json
+import threading
+import numpy as np
+
+# Spare capacity added when the matrix grows, so most daily updates land in place.
+SYMBOL_CHUNK = 64
+DATE_CHUNK = 256
+
+# Rows processed per block by whole-universe scans, bounding memory on large matrices.
+ROW_CHUNK = 4096
+
+class PriceMatrix:
+    """
+    On-disk symbols x trading-days price matrix for universe-wide analytics.
+
+    Prices live in a row-major np.memmap (values.dat) with spare rows and columns; NaN
+    marks days a symbol has no bar. meta.json holds the dtype, the allocated shape, the
+    symbol index (row order) and the date index (sorted trading days, one per column).
+    update() writes a symbol's series in place; new symbols and new trailing dates use
+    the spare capacity, and only running out of it or inserting dates before existing
+    ones rewrites the file. `values` is a zero-copy view of the used region.
+    """
+    def __init__(self, directory, dtype=np.float64):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dtype = np.dtype(meta["dtype"])
+            self.symbols = meta["symbols"]
+            self.dates = np.array(meta["dates"], dtype="datetime64[D]")
+            self._data = np.memmap(self._data_path(), dtype=self.dtype, mode="r+", shape=tuple(meta["capacity"]))
+        else:
+            self.dtype = np.dtype(dtype)
+            self.symbols = []
+            self.dates = np.array([], dtype="datetime64[D]")
+            self._data = self._allocate(self._data_path(), (SYMBOL_CHUNK, DATE_CHUNK))
+        self.symbol_index = {symbol: row for row, symbol in enumerate(self.symbols)}
+
+    def _data_path(self):
+        return os.path.join(self.directory, "values.dat")
+
+    def _allocate(self, path, shape):
+        data = np.memmap(path, dtype=self.dtype, mode="w+", shape=shape)
+        for start in range(0, shape[0], ROW_CHUNK):
+            data[start:start + ROW_CHUNK] = np.nan
+        return data
+
+    @property
+    def values(self):
+        """View of the used region: one row per symbol, one column per date."""
+        return self._data[:len(self.symbols), :len(self.dates)]
+
+    def row(self, symbol):
+        return self.values[self.symbol_index[symbol]]
+
+    def date_position(self, date):
+        """First column on or after `date` (None means the first column)."""
+        if date is None:
+            return 0
+        return int(np.searchsorted(self.dates, np.datetime64(date, "D"), side="left"))
+
+    def update(self, symbol, dates, values):
+        """Write a symbol's prices for the given dates (other days keep their stored values)."""
+        dates = np.asarray(dates).astype("datetime64[D]")
+        values = np.asarray(values, dtype=self.dtype)
+        with self._lock:
+            new_dates = np.setdiff1d(dates, self.dates)
+            n_rows = len(self.symbols) + (symbol not in self.symbol_index)
+            rows_needed = max(self._data.shape[0], n_rows)
+            if n_rows > self._data.shape[0]:
+                rows_needed = n_rows + max(SYMBOL_CHUNK, self._data.shape[0])
+            if len(new_dates) and len(self.dates) and new_dates[0] < self.dates[-1]:
+                # Dates inside the existing range shift every later column.
+                self._relayout(rows_needed, np.union1d(self.dates, new_dates))
+            elif len(new_dates):
+                all_dates = np.concatenate([self.dates, new_dates])
+                if len(all_dates) > self._data.shape[1] or rows_needed > self._data.shape[0]:
+                    self._relayout(rows_needed, all_dates)
+                else:
+                    # Spare columns may hold values written before a crash that meta.json
+                    # never recorded; clear them before they join the index.
+                    for start in range(0, len(self.symbols), ROW_CHUNK):
+                        self._data[start:start + ROW_CHUNK, len(self.dates):len(all_dates)] = np.nan
+                    self.dates = all_dates
+            elif rows_needed > self._data.shape[0]:
+                self._relayout(rows_needed, self.dates)
+            if symbol not in self.symbol_index:
+                # Likewise for a spare row taken by a new symbol.
+                self._data[len(self.symbols)] = np.nan
+                self.symbol_index[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            self._data[self.symbol_index[symbol], np.searchsorted(self.dates, dates)] = values
+
+    def _relayout(self, n_rows, dates):
+        """Copy the matrix into a larger file laid out for `dates`, then swap it in."""
+        n_cols = len(dates) + DATE_CHUNK
+        tmp_path = f"{self._data_path()}.tmp"
+        data = self._allocate(tmp_path, (n_rows, n_cols))
+        columns = np.searchsorted(dates, self.dates)
+        for start in range(0, len(self.symbols), ROW_CHUNK):
+            stop = min(start + ROW_CHUNK, len(self.symbols))
+            data[start:stop, columns] = self._data[start:stop, :len(self.dates)]
+        data.flush()
+        del self._data
+        os.replace(tmp_path, self._data_path())
+        self._data = np.memmap(self._data_path(), dtype=self.dtype, mode="r+", shape=(n_rows, n_cols))
+        self.dates = dates
+        # The old index no longer describes the new file.
+        self._write_meta()
+
+    def flush(self):
+        """Write pending changes and the indexes to disk."""
+        with self._lock:
+            self._data.flush()
+            self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            "dtype": self.dtype.str,
+            "capacity": list(self._data.shape),
+            "symbols": self.symbols,
+            "dates": [str(date) for date in self.dates],
+        }
+        meta_path = os.path.join(self.directory, "meta.json")
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
@@ -1,102 +1,497 @@
 import os
 import time
+import threading
 import datetime
+import heapq
+import operator
 import numpy as np
 import pandas as pd
-import requests
 from scipy.signal import find_peaks
 from dotenv import load_dotenv
+from alphaVantageClient import (fetch_json, fetch_many, check_api_limit, classify_response, configure_from_env,
+                                PREMIUM_ONLY)
+from rateLimiter import QuotaExhausted
+from runCheckpoint import RunCheckpoint
+from priceStore import load_prices, save_prices, merge_prices, needs_full_refresh, COMPACT_BARS
+import metrics
+from logConfig import configure_logging
+from dataLake import DataLake, PRICES
+from sqliteStore import SqliteStore
+from priceMatrix import PriceMatrix, ROW_CHUNK
 
-def fetch_data_for_symbol(symbol, base_url, api_token):
+# Output column -> Alpha Vantage TIME_SERIES_DAILY field.
+DAILY_FIELDS = {
+    "open": "1. open",
+    "high": "2. high",
+    "low": "3. low",
+    "close": "4. close",
+    "volume": "5. volume",
+}
+
+@metrics.timed("parse_daily_series")
+def parse_daily_series(time_series, symbol):
+    """
+    Convert a TIME_SERIES_DAILY "Time Series (Daily)" mapping into a DataFrame sorted by date.
+    Dates and OHLCV values are pulled out in bulk into NumPy arrays and converted in one
+    vectorized call each. `stock_price` mirrors `close` for the analysis code.
+    """
+    n = len(time_series)
+    if n == 0:
+        return pd.DataFrame()
+    dates = pd.to_datetime(np.fromiter(time_series.keys(), dtype=object, count=n), format="ISO8601")
+    get_fields = operator.itemgetter(*DAILY_FIELDS.values())
+    values = np.array(list(map(get_fields, time_series.values())), dtype=np.float64)
+    return daily_frame(dates, values, symbol)
+
+def daily_frame(dates, values, symbol):
+    """
+    Build the parsed daily frame from parsed dates and an (n, 5) float array of values in
+    DAILY_FIELDS order. All columns go into one constructor call, which is several times
+    cheaper than inserting them one by one.
+    """
+    order = np.argsort(dates.values, kind="stable")
+    values = values[order]
+    columns = {"date": dates[order]}
+    for i, column in enumerate(DAILY_FIELDS):
+        columns[column] = values[:, i]
+    columns["stock_price"] = columns["close"]
+    columns["ticker"] = symbol
+    return pd.DataFrame(columns)
+
+# Set once the API refuses outputsize=full (a premium feature on free keys); compact is used from then on.
+_full_refused = threading.Event()
+
+@metrics.timed("fetch_data_for_symbol")
+def fetch_data_for_symbol(symbol, base_url, api_token, outputsize="compact", since=None):
     """
     Fetch historical stock price data for a given symbol from Alpha Vantage using the TIME_SERIES_DAILY endpoint.
+    "compact" returns the last 100 data points, "full" the whole history; when the key may
+    not request "full", compact is fetched instead. If `since` (YYYY-MM-DD) is given, only
+    bars on or after that date are parsed. Returns None if the API limit is reached.
     """
+    if outputsize == "full" and _full_refused.is_set():
+        outputsize = "compact"
     params = {
         "function": "TIME_SERIES_DAILY",
         "symbol": symbol,
         "apikey": api_token,
-        "outputsize": "compact"  # "compact" returns the last 100 data points
+        "outputsize": outputsize
     }
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(base_url, params)
+        if check_api_limit(data, symbol, "TIME_SERIES_DAILY"):
+            return None
         if "Time Series (Daily)" not in data:
+            if outputsize == "full" and classify_response(data) == PREMIUM_ONLY:
+                _full_refused.set()
+                print(f"outputsize=full is not available with this API key; fetching compact data for {symbol}.")
+                return fetch_data_for_symbol(symbol, base_url, api_token, since=since)
             print(f"No valid data for {symbol}: {data.get('Note') or data.get('Error Message')}")
             return pd.DataFrame()
         time_series = data["Time Series (Daily)"]
-        # Convert the time series dict into a DataFrame with date and closing price.
-        df = pd.DataFrame([
-            {"date": pd.to_datetime(date), "stock_price": float(values["4. close"]), "ticker": symbol}
-            for date, values in time_series.items()
-        ])
-        df = df.sort_values(by="date")
-        return df
+        if since is not None:
+            time_series = {date: values for date, values in time_series.items() if date >= since}
+        return parse_daily_series(time_series, symbol)
+    except QuotaExhausted as e:
+        print(f"Daily API limit reached for {symbol}: {e}")
+        return None
     except Exception as e:
         print(f"Error fetching data for {symbol}: {e}")
         return pd.DataFrame()
 
+def update_symbol_prices(symbol, base_url, api_token, store_dir, on_new_bars=None):
+    """
+    Bring the local price store for `symbol` up to date and return its full history.
+    The first run seeds the store with outputsize=full; later runs fetch a compact
+    response and merge only bars from the last stored date onwards. `on_new_bars`, if
+    given, is called with the bars fetched by this call (when there are any).
+    Returns None if the API limit is reached.
+    """
+    existing = load_prices(store_dir, symbol)
+    if needs_full_refresh(existing):
+        new = fetch_data_for_symbol(symbol, base_url, api_token, outputsize="full")
+    else:
+        since = existing["date"].max().strftime("%Y-%m-%d")
+        new = fetch_data_for_symbol(symbol, base_url, api_token, since=since)
+    if new is None:
+        return None
+    if new.empty:
+        return existing
+    if on_new_bars is not None:
+        on_new_bars(new)
+    merged = merge_prices(existing, new)
+    save_prices(store_dir, symbol, merged)
+    return merged
+
+def load_price_series(lake, symbol, start_date=None, end_date=None):
+    """
+    Read a symbol's closing prices from the data lake as (dates, values) NumPy arrays,
+    ready for extract_peaks_from_series. Only the date and price columns inside the
+    optional window are read.
+    """
+    df = lake.read(PRICES, symbol, columns=['date', 'stock_price'], start=start_date, end=end_date)
+    if df.empty:
+        return np.array([], dtype='datetime64[ns]'), np.array([], dtype=np.float64)
+    return df['date'].to_numpy(), df['stock_price'].to_numpy()
+
 def get_top_companies(df, top_n=5):
     # For demonstration, we select the top companies by average stock price.
     avg_price = df.groupby('ticker')['stock_price'].mean().abs()
     top_companies = avg_price.sort_values(ascending=False).head(top_n).index.tolist()
     return top_companies
 
-def extract_peaks_from_series(dates, values, num_peaks=3):
-    # Find all local peaks in the stock price series.
-    peaks_indices, _ = find_peaks(values)
-    
-    if len(peaks_indices) == 0:
-        return []
+def mean_abs_price(df):
+    """Default ranking metric: absolute average stock price, as in get_top_companies."""
+    return abs(df['stock_price'].mean())
 
-    # Sort the peaks by price in descending order and select the top peaks.
-    peak_values = values[peaks_indices]
-    sorted_peak_indices = peaks_indices[np.argsort(peak_values)[::-1]]
-    top_peak_indices = sorted_peak_indices[:num_peaks]
-    
-    return [(dates[i], values[i]) for i in top_peak_indices]
+class StreamingTopN:
+    """
+    Streaming counterpart of get_top_companies: feed one frame per ticker as it is
+    fetched and only the current top_n frames are kept, in a bounded min-heap keyed
+    by metric(df). Memory stays O(top_n x series length) regardless of universe size.
+    """
+    def __init__(self, top_n=5, metric=mean_abs_price):
+        self.top_n = top_n
+        self.metric = metric
+        self.heap = []
+        self.count = 0
+
+    def add(self, ticker, df):
+        score = self.metric(df)
+        if np.isnan(score):
+            return
+        # The counter keeps heap comparisons away from the DataFrames.
+        item = (score, ticker, self.count, df)
+        self.count += 1
+        if len(self.heap) < self.top_n:
+            heapq.heappush(self.heap, item)
+        elif item[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, item)
+
+    def top(self):
+        """Tickers of the kept frames, best first."""
+        return [item[1] for item in sorted(self.heap, reverse=True, key=lambda item: item[:2])]
+
+    def frame(self):
+        """Long-format frame of the kept tickers (empty if nothing was added)."""
+        if not self.heap:
+            return pd.DataFrame()
+        return pd.concat([item[3] for item in self.heap], ignore_index=True)
+
+def select_top_peaks(dates, values, num_peaks=3, prominence=None, distance=None, width=None,
+                     start_date=None, end_date=None):
+    """
+    Find local peaks in a price series and return the `num_peaks` highest as
+    (peak_dates, peak_values) NumPy arrays, highest first (ties go to the later date).
+
+    prominence, distance and width are passed through to scipy.signal.find_peaks.
+    start_date / end_date keep only peaks inside that window; detection still sees the
+    whole series so prominence is measured against the full history. The k-th highest
+    value is found with a partition, so only the peaks at or above it are sorted.
+    """
+    values = np.asarray(values)
+    dates = np.asarray(dates)
+    peak_indices, _ = find_peaks(values, prominence=prominence, distance=distance, width=width)
+    if start_date is not None:
+        peak_indices = peak_indices[dates[peak_indices] >= np.datetime64(start_date)]
+    if end_date is not None:
+        peak_indices = peak_indices[dates[peak_indices] <= np.datetime64(end_date)]
+
+    if num_peaks <= 0:
+        peak_indices = peak_indices[:0]
+    elif len(peak_indices) > num_peaks:
+        # Keep every peak tied with the k-th highest so the sort below breaks ties by date.
+        peak_values = values[peak_indices]
+        kth = np.partition(peak_values, len(peak_indices) - num_peaks)[len(peak_indices) - num_peaks]
+        peak_indices = peak_indices[peak_values >= kth]
+    order = np.lexsort((-peak_indices, -values[peak_indices]))
+    peak_indices = peak_indices[order[:max(num_peaks, 0)]]
+    return dates[peak_indices], values[peak_indices]
+
+@metrics.timed("extract_peaks_from_series")
+def extract_peaks_from_series(dates, values, num_peaks=3, **peak_filters):
+    """
+    Return the top peaks of a price series as a list of (date, value) tuples.
+    Accepts the same filters as select_top_peaks.
+    """
+    peak_dates, peak_values = select_top_peaks(dates, values, num_peaks, **peak_filters)
+    return list(zip(peak_dates, peak_values))
+
+def _peaks_task(arrays, num_peaks, peak_filters):
+    return extract_peaks_from_series(arrays["date"], arrays["value"], num_peaks, **peak_filters)
+
+def extract_peaks_many(series, num_peaks=3, pool=None, **peak_filters):
+    """
+    extract_peaks_from_series for many series, given as {symbol: (dates, values)}.
+    With a SharedMemoryPool the series reach the workers through one shared-memory
+    block instead of being pickled. Returns {symbol: peaks} in the input order.
+    """
+    if pool is None:
+        return {symbol: extract_peaks_from_series(dates, values, num_peaks, **peak_filters)
+                for symbol, (dates, values) in series.items()}
+    arrays = [{"date": np.asarray(dates), "value": np.asarray(values, dtype=np.float64)}
+              for dates, values in series.values()]
+    return dict(zip(series, pool.map(_peaks_task, arrays, num_peaks, peak_filters)))
+
+def peak_filters_from_env():
+    """Read optional peak filters (PEAK_PROMINENCE, PEAK_DISTANCE, PEAK_WIDTH, PEAK_START_DATE, PEAK_END_DATE)."""
+    filters = {}
+    for name, cast in (('prominence', float), ('distance', int), ('width', float),
+                       ('start_date', str), ('end_date', str)):
+        value = os.getenv(f'PEAK_{name.upper()}')
+        if value:
+            filters[name] = cast(value)
+    return filters
+
+def find_local_maxima_2d(matrix):
+    """
+    Find local maxima in every row of a 2-D array whose rows are right-padded with NaN.
+    Matches scipy.signal.find_peaks without conditions: edge samples are never peaks and
+    a flat peak reports its middle sample (rounded down). Works in one vectorized pass
+    by flattening the rows, separated by NaN, and comparing each run of equal values
+    with its neighbouring runs. Returns (rows, cols) index arrays ordered by row, then column.
+    """
+    n_rows, n_cols = matrix.shape
+    padded = np.full((n_rows, n_cols + 1), np.nan)
+    padded[:, :n_cols] = matrix
+    flat = np.concatenate(([np.nan], padded.ravel()))
+
+    # NaN != NaN, so padding and separators always form runs of their own.
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    ends = np.append(starts[1:] - 1, len(flat) - 1)
+    run_values = flat[starts]
+    left = np.concatenate(([np.nan], run_values[:-1]))
+    right = np.append(run_values[1:], np.nan)
+    is_peak = (left < run_values) & (right < run_values)
+
+    positions = (starts[is_peak] + ends[is_peak]) // 2 - 1
+    return positions // (n_cols + 1), positions % (n_cols + 1)
+
+@metrics.timed("extract_peaks_batch")
+def extract_peaks_batch(df, tickers, num_peaks=3, **peak_filters):
+    """
+    Batch version of extract_peaks_from_series for many tickers at once.
+    Groups the long-format frame once, lays the prices out as a NaN-padded
+    tickers x days matrix and finds every ticker's peaks in a single pass.
+    Returns {ticker: [(date, value), ...]} with the same peaks as the per-ticker path,
+    highest first (ties go to the later date). Peak filters (see select_top_peaks)
+    are applied per row of the matrix, since find_peaks' conditions are not batched.
+    """
+    subset = df[df['ticker'].isin(tickers)].sort_values(by=['ticker', 'date'], kind='stable')
+    codes, uniques = pd.factorize(subset['ticker'], sort=True)
+    results = {ticker: [] for ticker in tickers}
+    if len(uniques) == 0:
+        return results
+    offsets = subset.groupby(codes).cumcount().to_numpy()
+    n_cols = offsets.max() + 1
+    prices = np.full((len(uniques), n_cols), np.nan)
+    prices[codes, offsets] = subset['stock_price'].to_numpy()
+    dates = np.empty((len(uniques), n_cols), dtype=subset['date'].dtype)
+    dates[codes, offsets] = subset['date'].to_numpy()
+    results.update(top_peaks_2d(prices, dates, np.bincount(codes), uniques, num_peaks, **peak_filters))
+    return results
+
+def top_peaks_2d(prices, dates, lengths, labels, num_peaks=3, **peak_filters):
+    """
+    Top peaks of every row of a right-padded prices matrix, where row i holds labels[i]'s
+    first lengths[i] prices and `dates` the matching dates. Returns {label: [(date, value), ...]}.
+    """
+    results = {label: [] for label in labels}
+    if any(value is not None for value in peak_filters.values()):
+        for row, label in enumerate(labels):
+            n = lengths[row]
+            results[label] = list(zip(*select_top_peaks(dates[row, :n], prices[row, :n], num_peaks, **peak_filters)))
+        return results
+
+    rows, cols = find_local_maxima_2d(prices)
+    values = prices[rows, cols]
+    # Order by ticker, then value descending, then column descending.
+    order = np.lexsort((-cols, -values, rows))
+    rows, cols, values = rows[order], cols[order], values[order]
+    group_start = np.searchsorted(rows, rows, side='left')
+    keep = np.arange(len(rows)) - group_start < num_peaks
+    for row, col, value in zip(rows[keep], cols[keep], values[keep]):
+        results[labels[row]].append((dates[row, col], value))
+    return results
+
+def _matrix_rows(matrix, symbols):
+    """Row positions of `symbols` (all rows if None) and their labels."""
+    if symbols is None:
+        return slice(None), list(matrix.symbols)
+    symbols = [symbol for symbol in symbols if symbol in matrix.symbol_index]
+    return np.array([matrix.symbol_index[symbol] for symbol in symbols], dtype=np.intp), symbols
+
+@metrics.timed("get_top_companies_matrix")
+def get_top_companies_matrix(matrix, symbols=None, top_n=5, since=None):
+    """
+    get_top_companies over a PriceMatrix: rank symbols (all by default) by the absolute
+    mean of their prices on or after `since`. Rows are scanned in blocks straight from
+    the memory map, so the universe never has to fit in memory at once.
+    """
+    rows, labels = _matrix_rows(matrix, symbols)
+    values = matrix.values[:, matrix.date_position(since):]
+    n = len(labels)
+    means = np.empty(n)
+    for start in range(0, n, ROW_CHUNK):
+        stop = min(start + ROW_CHUNK, n)
+        block = values[start:stop] if isinstance(rows, slice) else values[rows[start:stop]]
+        counts = np.count_nonzero(~np.isnan(block), axis=1)
+        sums = np.nansum(block, axis=1)
+        means[start:stop] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    means = np.abs(means)
+    ranked = [i for i in np.argsort(-means, kind='stable') if not np.isnan(means[i])]
+    return [labels[i] for i in ranked[:top_n]]
+
+@metrics.timed("extract_peaks_matrix")
+def extract_peaks_matrix(matrix, symbols, num_peaks=3, since=None, **peak_filters):
+    """
+    extract_peaks_batch over a PriceMatrix for the given symbols, using prices on or
+    after `since`. Each row's observed prices are compacted to the left first, so days
+    a symbol has no bar neither split nor create peaks and the results match
+    extract_peaks_from_series on the symbol's own series.
+    """
+    rows, labels = _matrix_rows(matrix, symbols)
+    results = {symbol: [] for symbol in symbols}
+    if not labels:
+        return results
+    lo = matrix.date_position(since)
+    block = matrix.values[rows, lo:]
+    valid = ~np.isnan(block)
+    lengths = valid.sum(axis=1)
+    order = np.argsort(~valid, axis=1, kind='stable')
+    prices = np.take_along_axis(block, order, axis=1)
+    prices[np.arange(prices.shape[1]) >= lengths[:, None]] = np.nan
+    # Parse the day index like parse_daily_series so peak dates carry the same unit.
+    dates = pd.to_datetime(matrix.dates[lo:].astype(str), format='ISO8601').to_numpy()[order]
+    results.update(top_peaks_2d(prices, dates, lengths, labels, num_peaks, **peak_filters))
+    return results
+
+def report_top_peaks(top_companies, results, store=None):
+    print("Top companies by average stock price:", top_companies)
+    if store is not None:
+        store.replace_peaks(results)
+
+    # Display the results.
+    for company, peaks in results.items():
+        print(f"\nCompany: {company}")
+        if peaks:
+            for date, value in peaks:
+                print(f"  Peak at {date}: {value}")
+        else:
+            print("  No peaks found.")
 
 def main():
+    run_start = time.perf_counter()
     load_dotenv()
+    configure_logging()
+    configure_from_env()
     api_token = os.getenv('API_TOKEN')
     base_url = os.getenv('BASE_URL', 'https://www.alphavantage.co/query')
+    max_workers = int(os.getenv('MAX_WORKERS', '1'))
+    # PRICE_STORE_DIR keeps each symbol's daily bars on disk and fetches only new ones;
+    # the first run per symbol asks for the full history (compact on keys without it).
+    store_dir = os.getenv('PRICE_STORE_DIR', '')
+    # Companies are ranked and peaks found over each symbol's last COMPACT_BARS bars (what a
+    # compact response holds), even when the price store keeps the full history.
+    # LOOKBACK_DAYS analyses that many calendar days instead; 0 uses the whole stored history.
+    lookback_days = os.getenv('LOOKBACK_DAYS')
+    # RESUME=1 continues a run that stopped on the API limit instead of starting over.
+    resume = os.getenv('RESUME', '').lower() in ('1', 'true', 'yes')
+    checkpoint_file = os.getenv('CHECKPOINT_FILE', 'price_checkpoint.jsonl')
+    # DATA_LAKE_DIR also keeps every fetched bar in a local columnar store.
+    lake_dir = os.getenv('DATA_LAKE_DIR', '')
+    lake = DataLake(lake_dir) if lake_dir else None
+    # SQLITE_DB also writes bars and the computed peaks to an SQLite file for ad-hoc queries.
+    sqlite_db = os.getenv('SQLITE_DB', '')
+    store = SqliteStore(sqlite_db) if sqlite_db else None
+    # PRICE_MATRIX_DIR keeps a memory-mapped symbols x dates matrix and ranks and finds peaks on it.
+    matrix_dir = os.getenv('PRICE_MATRIX_DIR', '')
+    matrix = PriceMatrix(matrix_dir) if matrix_dir else None
     symbols_str = os.getenv('SYMBOLS', '')
     if not symbols_str:
         print("No symbols provided in .env. Please add a SYMBOLS variable.")
         return
     symbols = [s.strip() for s in symbols_str.split(',') if s.strip()]
     
-    all_data = []
-    for symbol in symbols:
-        print(f"Fetching data for {symbol}...")
-        df_symbol = fetch_data_for_symbol(symbol, base_url, api_token)
+    checkpoint = RunCheckpoint(checkpoint_file, resume=resume)
+    cutoff = None
+    lookback_bars = COMPACT_BARS if not lookback_days else None
+    if lookback_days and int(lookback_days) > 0:
+        cutoff = pd.Timestamp.today().normalize() - pd.Timedelta(days=int(lookback_days))
+
+    def fetch(symbol):
+        with metrics.timer('symbol_seconds'):
+            return fetch_symbol(symbol)
+
+    def fetch_symbol(symbol):
+        if store_dir and checkpoint.is_done(symbol, "TIME_SERIES_DAILY"):
+            # Already fetched by the interrupted run; read it back from the store.
+            df_symbol = load_prices(store_dir, symbol)
+        else:
+            print(f"Fetching data for {symbol}...")
+            if store_dir:
+                df_symbol = update_symbol_prices(symbol, base_url, api_token, store_dir,
+                                                 on_new_bars=lambda new: write_new_bars(symbol, new))
+            else:
+                df_symbol = fetch_data_for_symbol(symbol, base_url, api_token)
+                if df_symbol is not None and not df_symbol.empty:
+                    write_new_bars(symbol, df_symbol)
+            if df_symbol is not None:
+                checkpoint.mark_done(symbol, "TIME_SERIES_DAILY")
+        if df_symbol is None or df_symbol.empty:
+            return df_symbol
+        if matrix is not None:
+            matrix.update(symbol, df_symbol['date'], df_symbol['stock_price'])
+        if cutoff is not None:
+            df_symbol = df_symbol[df_symbol['date'] >= cutoff]
+        elif lookback_bars is not None:
+            df_symbol = df_symbol.tail(lookback_bars)
+        return df_symbol
+
+    def write_new_bars(symbol, new):
+        # Only the bars fetched this run go to the lake and the SQLite store.
+        if lake is not None:
+            lake.append(PRICES, symbol, new)
+        if store is not None:
+            store.write_prices(symbol, new)
+
+    # Select the top companies based on average stock price while fetching
+    # (or afterwards from the price matrix, when one is kept).
+    selector = StreamingTopN(top_n=5)
+    fetched = []
+    for symbol, df_symbol in fetch_many(symbols, fetch, max_workers):
+        if df_symbol is None:
+            print("Daily API limit reached. Stopping further fetching.")
+            print(f"Progress saved to {checkpoint_file}; rerun with RESUME=1 to continue.")
+            break
         if not df_symbol.empty:
-            all_data.append(df_symbol)
-    if not all_data:
+            fetched.append(symbol)
+            if matrix is None:
+                selector.add(symbol, df_symbol)
+    else:
+        checkpoint.clear()
+    peak_filters = peak_filters_from_env()
+    if matrix is not None:
+        matrix.flush()
+        if lookback_bars is not None and len(matrix.dates) > lookback_bars:
+            # The matrix's last COMPACT_BARS trading days stand in for each symbol's last bars.
+            cutoff = pd.Timestamp(matrix.dates[-lookback_bars])
+        top_companies = get_top_companies_matrix(matrix, fetched, top_n=5, since=cutoff)
+        results = extract_peaks_matrix(matrix, top_companies, num_peaks=3, since=cutoff, **peak_filters)
+    else:
+        top_companies = selector.top()
+        results = extract_peaks_batch(selector.frame(), top_companies, num_peaks=3, **peak_filters)
+    if not top_companies:
         print("No data fetched from API. Exiting.")
-        return
-    data_df = pd.concat(all_data, ignore_index=True)
-    
-    # Select the top companies based on average stock price.
-    top_companies = get_top_companies(data_df, top_n=5)
-    print("Top companies by average stock price:", top_companies)
-    
-    results = {}
-    for company in top_companies:
-        company_df = data_df[data_df['ticker'] == company].sort_values(by='date')
-        dates = company_df['date'].values
-        prices = company_df['stock_price'].values
-        peaks = extract_peaks_from_series(dates, prices, num_peaks=3)
-        results[company] = peaks
+    else:
+        report_top_peaks(top_companies, results, store)
+    if store is not None:
+        store.close()
 
-    # Display the results.
-    for company, peaks in results.items():
-        print(f"\nCompany: {company}")
-        if peaks:
-            for date, value in peaks:
-                print(f"  Peak at {date}: {value}")
-        else:
-            print("  No peaks found.")
+    metrics.registry.set('run_seconds', time.perf_counter() - run_start)
+    metrics_dir = metrics.write_metrics_from_env('price_peaks')
+    if metrics_dir:
+        print(f"Wrote run metrics to {metrics_dir}.")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,44 @@
+import os
+import datetime
+import numpy as np
+import pandas as pd
+
+# "compact" TIME_SERIES_DAILY responses hold the latest 100 trading days.
+COMPACT_BARS = 100
+
+def store_path(directory, symbol):
+    return os.path.join(directory, f"{symbol}.csv")
+
+def load_prices(directory, symbol):
+    """Load the stored daily bars for `symbol`, or an empty DataFrame if none are stored."""
+    path = store_path(directory, symbol)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_csv(path, parse_dates=["date"])
+
+def save_prices(directory, symbol, df):
+    """Atomically replace the stored bars for `symbol`."""
+    os.makedirs(directory, exist_ok=True)
+    path = store_path(directory, symbol)
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def merge_prices(existing, new):
+    """Merge new bars into existing ones by date; new bars win on overlap."""
+    if existing.empty:
+        return new.sort_values(by="date").reset_index(drop=True)
+    merged = pd.concat([existing, new], ignore_index=True)
+    merged = merged.drop_duplicates(subset="date", keep="last")
+    return merged.sort_values(by="date").reset_index(drop=True)
+
+def needs_full_refresh(existing, today=None):
+    """
+    True when the store is empty or its last bar is too old for a compact
+    response to bridge the gap without leaving a hole in the series.
+    """
+    if existing.empty:
+        return True
+    today = today or datetime.date.today()
+    last_date = existing["date"].max().date()
+    return np.busday_count(last_date, today) >= COMPACT_BARS
@@ -0,0 +1,106 @@
+import random
+import threading
+import time
+
+class QuotaExhausted(Exception):
+    """Raised when the daily request quota is used up and waiting would not help."""
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens and refills at `rate` tokens per second.
+    Not thread-safe on its own; QuotaLimiter serializes access.
+    """
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens=1):
+        """Seconds until `tokens` are available (0 if they are available now)."""
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def consume(self, tokens=1):
+        self.tokens -= tokens
+
+class QuotaLimiter:
+    """
+    Thread-safe limiter enforcing the Alpha Vantage per-minute and per-day quotas.
+    acquire() blocks while the per-minute bucket is empty and raises QuotaExhausted
+    when the per-day bucket is empty, mirroring the stop-on-limit behaviour of the scripts.
+    A quota of None or 0 disables that bucket.
+    """
+    def __init__(self, per_minute=None, per_day=None, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.minute_bucket = None
+        self.day_bucket = None
+        self.base_rate = per_minute / 60.0 if per_minute else None
+        if per_minute:
+            self.minute_bucket = TokenBucket(self.base_rate, burst or per_minute, clock)
+        if per_day:
+            self.day_bucket = TokenBucket(per_day / 86400.0, per_day, clock)
+        self.sleep = sleep
+        self.lock = threading.Lock()
+
+    def throttled(self):
+        """The server throttled us: halve the per-minute refill rate (never below 1/8 of the quota)."""
+        with self.lock:
+            if self.minute_bucket is not None:
+                bucket = self.minute_bucket
+                bucket._refill()
+                bucket.rate = max(bucket.rate / 2, self.base_rate / 8)
+                bucket.tokens = min(bucket.tokens, 0.0)
+
+    def succeeded(self):
+        """A request went through: creep the per-minute rate back up towards the configured quota."""
+        with self.lock:
+            if self.minute_bucket is not None:
+                bucket = self.minute_bucket
+                bucket._refill()
+                bucket.rate = min(self.base_rate, bucket.rate + self.base_rate / 10)
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                if self.day_bucket is not None and self.day_bucket.wait_time() > 0:
+                    raise QuotaExhausted("Daily request quota exhausted.")
+                wait = self.minute_bucket.wait_time() if self.minute_bucket is not None else 0.0
+                if wait == 0:
+                    if self.minute_bucket is not None:
+                        self.minute_bucket.consume()
+                    if self.day_bucket is not None:
+                        self.day_bucket.consume()
+                    return
+            self.sleep(wait)
+
+class AdaptiveBackoff:
+    """
+    Shared retry delay that adapts to how often the server pushes back: each throttle
+    doubles the delay (up to max_delay), each success halves it back towards base_delay.
+    Delays carry +/-25% jitter so concurrent workers do not retry in lockstep.
+    """
+    def __init__(self, base_delay=1.0, max_delay=60.0, factor=2.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.delay = base_delay
+        self.lock = threading.Lock()
+
+    def next_delay(self):
+        """Return the delay to wait now and grow it for the next failure."""
+        with self.lock:
+            delay = self.delay
+            self.delay = min(self.max_delay, self.delay * self.factor)
+        return delay * random.uniform(0.75, 1.25)
+
+    def succeeded(self):
+        with self.lock:
+            self.delay = max(self.base_delay, self.delay / self.factor)
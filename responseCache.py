@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import hashlib
+import datetime
+import threading
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_CLOSE = datetime.time(16, 0)
+
+# Seconds a cached response stays fresh, per Alpha Vantage function.
+# TIME_SERIES_DAILY is special-cased: it stays fresh until the next market close.
+DEFAULT_TTLS = {
+    "OVERVIEW": 3 * 24 * 3600,
+    "INSIDER_TRANSACTIONS": 6 * 3600,
+}
+DEFAULT_TTL = 3600
+UNTIL_NEXT_CLOSE = ("TIME_SERIES_DAILY",)
+
+class CacheMiss(Exception):
+    """Raised in cache-only mode when a request is not in the cache."""
+
+def next_market_close(timestamp):
+    """Return the epoch time of the first weekday 16:00 New York close after `timestamp`."""
+    moment = datetime.datetime.fromtimestamp(timestamp, MARKET_TZ)
+    close = datetime.datetime.combine(moment.date(), MARKET_CLOSE, MARKET_TZ)
+    if moment >= close:
+        close += datetime.timedelta(days=1)
+    while close.weekday() >= 5:
+        close += datetime.timedelta(days=1)
+    return close.timestamp()
+
+def is_cacheable(data):
+    """Only cache real payloads, never throttle, quota or error messages."""
+    return isinstance(data, dict) and not ("Note" in data or "Error Message" in data or "Information" in data)
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of Alpha Vantage JSON responses.
+
+    Entries are keyed by a hash of the request parameters (function, symbol and
+    any other params, excluding the API key) and stored as JSON files under
+    `directory`. Reads touch the file's mtime so that, when `max_bytes` is set,
+    the least recently used entries are evicted first. With `cache_only` set,
+    misses raise CacheMiss instead of falling through to the network.
+    """
+    def __init__(self, directory, max_bytes=None, ttls=None, cache_only=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.cache_only = cache_only
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(params):
+        material = {k: v for k, v in params.items() if k != "apikey"}
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def expires_at(self, function, stored_at):
+        if function in UNTIL_NEXT_CLOSE:
+            return next_market_close(stored_at)
+        return stored_at + self.ttls.get(function, DEFAULT_TTL)
+
+    def get(self, params):
+        """Return the cached payload for `params`, or None if absent or expired."""
+        path = self._path(self.key(params))
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if time.time() >= self.expires_at(entry.get("function"), entry.get("stored_at", 0)):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry["data"]
+
+    def put(self, params, data):
+        """Store `data` for `params`, then evict least recently used entries if over budget."""
+        key = self.key(params)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "function": params.get("function"),
+            "symbol": params.get("symbol"),
+            "stored_at": time.time(),
+            "data": data,
+        }
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        if self.max_bytes is not None:
+            with self._lock:
+                if self._size is None:
+                    self._size = self._disk_usage()
+                else:
+                    self._size += os.path.getsize(path) - old_size
+                if self._size > self.max_bytes:
+                    self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
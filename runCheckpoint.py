@@ -0,0 +1,59 @@
+import os
+import json
+import threading
+
+class RunCheckpoint:
+    """
+    Persistent record of the (symbol, endpoint) pairs a run has completed.
+
+    Completions are appended to a JSON-lines file as they happen, so a run that
+    stops on the daily quota leaves an accurate record behind. A completion can
+    carry the endpoint's payload, which a resumed run reads back with payload()
+    instead of requesting it again. With `resume` the existing record is loaded
+    and callers skip the finished work; otherwise the file is truncated and the
+    run starts from scratch.
+    """
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.completed = set()
+        self.payloads = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A torn last line from an interrupted run.
+                    self.completed.add((entry["symbol"], entry["endpoint"]))
+                    if "data" in entry:
+                        self.payloads[(entry["symbol"], entry["endpoint"])] = entry["data"]
+        else:
+            open(path, "w").close()
+
+    def is_done(self, symbol, endpoint):
+        return (symbol, endpoint) in self.completed
+
+    def payload(self, symbol, endpoint):
+        """The payload recorded with a completion loaded on resume, or None. Each is handed out once."""
+        with self._lock:
+            return self.payloads.pop((symbol, endpoint), None)
+
+    def mark_done(self, symbol, endpoint, data=None):
+        with self._lock:
+            if (symbol, endpoint) in self.completed:
+                return
+            self.completed.add((symbol, endpoint))
+            entry = {"symbol": symbol, "endpoint": endpoint}
+            if data is not None:
+                entry["data"] = data
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def clear(self):
+        """Forget all progress once a run has covered every symbol."""
+        with self._lock:
+            self.completed.clear()
+            self.payloads.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,123 @@
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import numpy as np
+
+# Byte alignment of each array inside a shared block.
+ALIGNMENT = 64
+
+class SharedArrays:
+    """
+    Named NumPy arrays copied into one multiprocessing.shared_memory block.
+    `spec` is a small picklable description of the block; worker processes pass it
+    to attach_arrays() to map the same memory without copying or unpickling the data.
+    The creating process owns the block and must call release() when workers are done.
+    """
+    def __init__(self, arrays):
+        layout = {}
+        size = 0
+        for name, array in arrays.items():
+            if array.dtype.hasobject:
+                raise TypeError(f"Array {name!r} holds Python objects and cannot be shared.")
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            layout[name] = (array.dtype.str, array.shape, size)
+            size += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, array in arrays.items():
+            dtype, shape, offset = layout[name]
+            np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offset)[...] = array
+        self.spec = (self.shm.name, layout)
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+def attach_arrays(spec):
+    """Map a block described by SharedArrays.spec; returns (shm, {name: array view})."""
+    name, layout = spec
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {}
+    for key, (dtype, shape, offset) in layout.items():
+        arrays[key] = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)
+        arrays[key].flags.writeable = False
+    return shm, arrays
+
+def _detach(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass  # A returned value still views the block; it is unmapped when collected.
+
+def _call_with_arrays(fn, spec, args):
+    shm, arrays = attach_arrays(spec)
+    try:
+        return fn(arrays, *args)
+    finally:
+        del arrays
+        _detach(shm)
+
+def _call_with_packed(fn, spec, offsets, args):
+    shm, packed = attach_arrays(spec)
+    try:
+        return [fn({name: array[start:stop] for name, array in packed.items()}, *args)
+                for start, stop in zip(offsets[:-1], offsets[1:])]
+    finally:
+        del packed
+        _detach(shm)
+
+class SharedMemoryPool:
+    """
+    Process pool whose tasks receive their inputs as NumPy arrays in shared memory
+    rather than as pickled objects. Task functions are called as fn(arrays, *args),
+    where `arrays` maps names to read-only views, and must be importable module-level
+    functions. Only the (small) return values are pickled back.
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def submit(self, fn, arrays, *args):
+        """Run fn(arrays, *args) in a worker; returns a Future. The block is freed once it completes."""
+        block = SharedArrays(arrays)
+        try:
+            future = self.executor.submit(_call_with_arrays, fn, block.spec, args)
+        except BaseException:
+            block.release()
+            raise
+        future.add_done_callback(lambda _: block.release())
+        return future
+
+    def map(self, fn, arrays_list, *args, chunksize=None):
+        """
+        Run fn(arrays, *args) for every dict in `arrays_list` and return the results in
+        the same order. The dicts must share their keys, and each dict's arrays the same
+        length along the first axis; everything travels in one shared block, sliced per
+        item in the workers, with `chunksize` items per task.
+        """
+        if not arrays_list:
+            return []
+        names = list(arrays_list[0])
+        lengths = [len(arrays[names[0]]) for arrays in arrays_list]
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        block = SharedArrays({name: np.concatenate([arrays[name] for arrays in arrays_list]) for name in names})
+        n = len(arrays_list)
+        chunksize = chunksize or max(1, math.ceil(n / (self.max_workers * 4)))
+        futures = []
+        try:
+            for start in range(0, n, chunksize):
+                stop = min(start + chunksize, n)
+                futures.append(self.executor.submit(_call_with_packed, fn, block.spec, offsets[start:stop + 1], args))
+            return [result for future in futures for result in future.result()]
+        finally:
+            wait(futures)
+            block.release()
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
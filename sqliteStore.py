@@ -0,0 +1,149 @@
+import json
+import sqlite3
+import datetime
+import threading
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS insider_transactions (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    net_value REAL
+);
+CREATE INDEX IF NOT EXISTS insider_symbol_date ON insider_transactions (symbol, date, net_value);
+CREATE INDEX IF NOT EXISTS insider_date_symbol ON insider_transactions (date, symbol, net_value);
+CREATE TABLE IF NOT EXISTS overviews (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    market_cap REAL,
+    data TEXT,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS peaks (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL,
+    rank INTEGER,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS peaks_date_symbol ON peaks (date, symbol, value, rank);
+"""
+
+def _iso(value):
+    """Dates are stored as YYYY-MM-DD text, which sorts and compares chronologically."""
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+class SqliteStore:
+    """
+    Embedded SQLite store of prices, parsed insider transactions, overview snapshots and
+    computed peaks for ad-hoc cross-symbol queries against local data.
+
+    Each write is one bulk transaction (executemany). Prices, overviews and peaks are
+    keyed by (symbol, date); insider transactions have covering (symbol, date, net_value)
+    and (date, symbol, net_value) indexes, so per-symbol lookups and screens over a
+    date range across all symbols are answered from the index alone. The connection is
+    shared between threads behind a lock.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def write_prices(self, symbol, df):
+        """Upsert daily bars (a frame with date, open, high, low, close, volume)."""
+        rows = zip([symbol] * len(df), df["date"].dt.strftime("%Y-%m-%d"),
+                   df["open"], df["high"], df["low"], df["close"], df["volume"])
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def replace_insider_transactions(self, symbol, parsed):
+        """
+        Replace a symbol's insider transactions with `parsed` (date, net_value), as returned
+        by parse_insider_transactions. INSIDER_TRANSACTIONS returns a symbol's whole
+        history, so replacing rather than appending keeps repeated fetches from duplicating.
+        """
+        rows = zip([symbol] * len(parsed), parsed["date"].dt.strftime("%Y-%m-%d"), parsed["net_value"])
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM insider_transactions WHERE symbol = ?", (symbol,))
+            self.conn.executemany("INSERT INTO insider_transactions VALUES (?, ?, ?)", rows)
+
+    def write_overview(self, symbol, overview, as_of=None):
+        """Upsert the overview snapshot taken on `as_of` (default today)."""
+        try:
+            market_cap = float(overview.get("MarketCapitalization"))
+        except (TypeError, ValueError):
+            market_cap = None
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO overviews VALUES (?, ?, ?, ?)",
+                              (symbol, _iso(as_of or datetime.date.today()), market_cap, json.dumps(overview)))
+
+    def replace_peaks(self, peaks_by_symbol):
+        """Store {symbol: [(date, value), ...]} (highest first), replacing each symbol's previous peaks."""
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM peaks WHERE symbol = ?", [(symbol,) for symbol in peaks_by_symbol])
+            self.conn.executemany("INSERT OR REPLACE INTO peaks VALUES (?, ?, ?, ?)", [
+                (symbol, _iso(date), float(value), rank)
+                for symbol, peaks in peaks_by_symbol.items()
+                for rank, (date, value) in enumerate(peaks, start=1)
+            ])
+
+    def query(self, sql, params=()):
+        """Run an ad-hoc SELECT and return the result as a DataFrame."""
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def insider_net_flows(self, days=30, as_of=None):
+        """
+        Net insider value per symbol from `days` days before `as_of` (default today) through
+        `as_of`, both ends included, like compute_insider_history and insider_flow_matrix.
+        """
+        end = pd.Timestamp(as_of or datetime.date.today())
+        start = end - pd.Timedelta(days=days)
+        return self.query(
+            "SELECT symbol, SUM(net_value) AS net_value, COUNT(*) AS transactions "
+            "FROM insider_transactions WHERE date >= ? AND date <= ? "
+            "GROUP BY symbol ORDER BY net_value",
+            (_iso(start), _iso(end)))
+
+    def net_insider_selling(self, threshold, days=30, as_of=None):
+        """Symbols whose net insider selling over insider_net_flows' window exceeds `threshold` dollars."""
+        flows = self.insider_net_flows(days, as_of)
+        return flows[flows["net_value"] < -threshold].reset_index(drop=True)
+
+    def peaks_between(self, start_date, end_date, symbols=None):
+        """Every stored peak dated between start_date and end_date (inclusive), by date."""
+        sql = "SELECT symbol, date, value, rank FROM peaks WHERE date BETWEEN ? AND ?"
+        params = [_iso(start_date), _iso(end_date)]
+        if symbols is not None:
+            symbols = list(symbols)
+            sql += f" AND symbol IN ({','.join('?' * len(symbols))})"
+            params += symbols
+        return self.query(sql + " ORDER BY date, symbol", params)
+
+    def price_history(self, symbol, start_date=None, end_date=None):
+        """Stored bars for `symbol`, optionally limited to a date range."""
+        return self.query(
+            "SELECT date, open, high, low, close, volume FROM prices "
+            "WHERE symbol = ? AND date >= ? AND date <= ? ORDER BY date",
+            (symbol, _iso(start_date) if start_date else "", _iso(end_date) if end_date else "9999-12-31"))
+
+    def latest_market_caps(self):
+        """Most recent stored market cap per symbol."""
+        return self.query(
+            "SELECT symbol, date, market_cap FROM overviews AS o "
+            "WHERE date = (SELECT MAX(date) FROM overviews WHERE symbol = o.symbol) ORDER BY symbol")